@@ -7,40 +7,129 @@ Développé par BellaajMohsen7 - 2025
 
 import streamlit as st
 import numpy as np
-import pickle
+import hashlib
+import heapq
+import importlib.util
+import logging
 import os
 import re
+import sys
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple, Set
+from typing import List, Dict, Any, Optional, Tuple, Set, Deque
 from dataclasses import dataclass
 from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 import json
 
-# Import required libraries with fallbacks
-try:
-    from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
-    from fuzzywuzzy import fuzz, process
-    DEPENDENCIES_AVAILABLE = True
-except ImportError:
-    DEPENDENCIES_AVAILABLE = False
-    st.error("Veuillez installer les dépendances: pip install sentence-transformers scikit-learn fuzzywuzzy python-levenshtein")
-
-@dataclass
+# Vérifier les dépendances sans les importer: sentence_transformers (et PyTorch)
+# n'est importé qu'au premier chargement du modèle
+DEPENDENCIES_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ('sentence_transformers', 'rapidfuzz')
+)
+if DEPENDENCIES_AVAILABLE:
+    from rapidfuzz import fuzz, process
+    from rapidfuzz.utils import default_process
+else:
+    st.error("Veuillez installer les dépendances: pip install sentence-transformers rapidfuzz")
+
+# Moteur regex du routage: RE2 (temps linéaire, sans retour arrière) s'il est installé, sinon re
+if importlib.util.find_spec('re2') is not None:
+    import re2 as _re_engine
+else:
+    _re_engine = re
+
+# Motif compilé par _re_engine: re.Pattern, ou l'objet RE2 équivalent (mêmes search et lastgroup)
+_CompiledPattern = Any
+
+# Contenu des règles, stocké à côté du module
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'belote_rules.json')
+
+# Modèle d'encodage et dossier du cache de ses embeddings de règles
+MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDINGS_CACHE_DIR = '.cache'
+
+# Backend ONNX Runtime (poids quantifiés int8, CPU) si optimum et onnxruntime sont installés
+ONNX_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ('onnxruntime', 'optimum')
+)
+ONNX_MODEL_FILE = os.environ.get('ST_ONNX_FILE', 'onnx/model_qint8_avx512_vnni.onnx')
+
+@dataclass(slots=True, frozen=True)
 class RuleMatch:
     rule_id: str
     score: float
     rule_data: Dict
     match_type: str = "semantic"  # semantic, fuzzy, pattern, exact
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HandEvaluation:
     recommended_announcement: int
     confidence: float
     reasoning: str
-    alternative_options: List[int]
+    alternative_options: Tuple[int, ...]
     detailed_analysis: str = ""
 
+# Patterns de variation commune
+_COMMON_VARIATIONS = {
+    'fr': {
+        r"règle?\s*d[\'\"]?annonce?s?": "règles annonces",
+        r"comment\s+annoncer": "comment annoncer",
+        r"quand\s+annoncer": "quand annoncer",
+        r"que?\s+annoncer": "que annoncer",
+        r"calcul\s*(?:de\s*)?(?:score|point)s?": "calcul score",
+        r"belote\s*(?:et\s*)?rebelote": "belote rebelote",
+        r"roi\s*(?:et\s*)?dame": "roi dame",
+        r"multiplicateur|coinche": "coinche",
+        r"tous\s*(?:les\s*)?plis": "capot"
+    },
+    'en': {
+        r"announcement?\s*rules?": "announcement rules",
+        r"how\s+to\s+announce": "how to announce",
+        r"when\s+to\s+announce": "when to announce",
+        r"what\s+to\s+announce": "what to announce",
+        r"score?\s*calculation": "score calculation",
+        r"belote\s*(?:and\s*)?rebelote": "belote rebelote",
+        r"king\s*(?:and\s*)?queen": "king queen",
+        r"multiplier|coinche": "coinche",
+        r"all\s*tricks": "capot"
+    }
+}
+
+# Variations compilées une seule fois à l'import
+_COMPILED_VARIATIONS = {
+    lang: tuple((re.compile(pattern, re.IGNORECASE), replacement) for pattern, replacement in patterns.items())
+    for lang, patterns in _COMMON_VARIATIONS.items()
+}
+
+# Alternative unique de toutes les variations: un seul scan suffit pour savoir s'il y a quelque chose à réécrire
+_VARIATION_TRIGGERS = {
+    lang: re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+    for lang, patterns in _COMMON_VARIATIONS.items()
+}
+
+@lru_cache(maxsize=4096)
+def _normalize_query_cached(query: str, language: str) -> str:
+    """Normaliser une requête (fonction pure, mémoïsée par requête et langue)"""
+    query = query.lower().strip()
+    
+    # Requête déjà canonique: aucune variation à appliquer
+    trigger = _VARIATION_TRIGGERS.get(language)
+    if trigger is None or not trigger.search(query):
+        return query
+    
+    # Appliquer les variations communes
+    for pattern, replacement in _COMPILED_VARIATIONS.get(language, ()):
+        query = pattern.sub(replacement, query)
+    
+    return query
+
+# Découpage en mots: \w+ est déjà délimité, les \b autour sont superflus
+_WORD_PATTERN = re.compile(r'\w+')
+
 class LanguageProcessor:
     """Processeur linguistique avancé pour Français et Anglais"""
     
@@ -69,64 +158,65 @@ class LanguageProcessor:
             'coinche': ['coinche', 'surcoinche', 'multiplier', 'double']
         }
         
-        # Patterns de variation commune
-        self.common_variations = {
-            'fr': {
-                r"règle?\s*d[\'\"]?annonce?s?": "règles annonces",
-                r"comment\s+annoncer": "comment annoncer",
-                r"quand\s+annoncer": "quand annoncer",
-                r"que?\s+annoncer": "que annoncer",
-                r"calcul\s*(?:de\s*)?(?:score|point)s?": "calcul score",
-                r"belote\s*(?:et\s*)?rebelote": "belote rebelote",
-                r"roi\s*(?:et\s*)?dame": "roi dame",
-                r"multiplicateur|coinche": "coinche",
-                r"tous\s*(?:les\s*)?plis": "capot"
-            },
-            'en': {
-                r"announcement?\s*rules?": "announcement rules",
-                r"how\s+to\s+announce": "how to announce",
-                r"when\s+to\s+announce": "when to announce",
-                r"what\s+to\s+announce": "what to announce",
-                r"score?\s*calculation": "score calculation",
-                r"belote\s*(?:and\s*)?rebelote": "belote rebelote",
-                r"king\s*(?:and\s*)?queen": "king queen",
-                r"multiplier|coinche": "coinche",
-                r"all\s*tricks": "capot"
-            }
+        # Patterns de variation commune (partagés au niveau du module)
+        self.common_variations = _COMMON_VARIATIONS
+        
+        # Table inversée mot -> ensemble des synonymes associés (recherche O(1))
+        self._synonym_lookup = {
+            'fr': self._build_synonym_lookup(self.french_synonyms),
+            'en': self._build_synonym_lookup(self.english_synonyms)
+        }
+        
+        # Regex unique des mots déclencheurs de synonymes (un seul scan par requête)
+        self._synonym_trigger_re = {
+            lang: re.compile(r'\b(?:' + '|'.join(sorted(map(re.escape, lookup), key=len, reverse=True)) + r')\b')
+            for lang, lookup in self._synonym_lookup.items()
         }
+        
+        # Mots-clés mémoïsés par (requête, langue): l'intention et la recherche réutilisent le même découpage
+        self._extract_keywords_cached = lru_cache(maxsize=1024)(self._extract_keywords)
+    
+    @staticmethod
+    def _build_synonym_lookup(synonyms_dict: Dict[str, List[str]]) -> Dict[str, frozenset]:
+        """Inverser un dictionnaire de synonymes en table mot -> synonymes"""
+        lookup: Dict[str, Set[str]] = {}
+        for synonyms in synonyms_dict.values():
+            synonyms = [sys.intern(word.lower()) for word in synonyms]
+            for word in synonyms:
+                lookup.setdefault(word, set()).update(synonyms)
+        return {word: frozenset(expansion) for word, expansion in lookup.items()}
     
     def normalize_query(self, query: str, language: str = 'fr') -> str:
         """Normaliser une requête"""
-        query = query.lower().strip()
-        
-        # Appliquer les variations communes
-        patterns = self.common_variations.get(language, {})
-        for pattern, replacement in patterns.items():
-            query = re.sub(pattern, replacement, query, flags=re.IGNORECASE)
-        
-        return query
+        return _normalize_query_cached(query, language)
     
-    def extract_keywords(self, query: str, language: str = 'fr') -> Set[str]:
-        """Extraire les mots-clés d'une requête"""
+    def extract_keywords(self, query: str, language: str = 'fr') -> frozenset:
+        """Extraire les mots-clés d'une requête (mémoïsé: une même requête n'est découpée qu'une fois)"""
+        return self._extract_keywords_cached(query, language)
+    
+    def _extract_keywords(self, query: str, language: str) -> frozenset:
+        """Découper la requête normalisée et ajouter les synonymes des mots déclencheurs"""
         normalized = self.normalize_query(query, language)
-        words = re.findall(r'\b\w+\b', normalized)
-        
-        keywords = set(words)
+        keywords = set(_WORD_PATTERN.findall(normalized))
         
-        # Ajouter les synonymes
-        synonyms_dict = self.french_synonyms if language == 'fr' else self.english_synonyms
+        # Ajouter les synonymes des mots déclencheurs trouvés en un seul scan
+        lang = 'fr' if language == 'fr' else 'en'
+        synonym_lookup = self._synonym_lookup[lang]
         
-        for word in words:
-            for key, synonyms in synonyms_dict.items():
-                if word in synonyms:
-                    keywords.update(synonyms)
+        for trigger in self._synonym_trigger_re[lang].findall(normalized):
+            keywords.update(synonym_lookup[trigger])
         
-        return keywords
+        return frozenset(keywords)
     
     def calculate_similarity(self, query1: str, query2: str) -> float:
         """Calculer la similarité entre deux requêtes"""
+        if DEPENDENCIES_AVAILABLE:
+            return fuzz.ratio(query1.lower(), query2.lower()) / 100.0
         return SequenceMatcher(None, query1.lower(), query2.lower()).ratio()
 
+# Motifs compilés une seule fois à l'import (évite la recompilation à chaque requête)
+_TRUMP_CARD_PATTERN = re.compile(r'(?:valet|jack|9|neuf|as|ace|10|dix|roi|king|dame|queen)')
+
 class EnhancedHandEvaluator:
     """Évaluateur de main expert amélioré"""
     
@@ -171,7 +261,7 @@ class EnhancedHandEvaluator:
             recommended_announcement=recommendation['points'],
             confidence=recommendation['confidence'],
             reasoning=recommendation['reasoning'],
-            alternative_options=recommendation['alternatives'],
+            alternative_options=tuple(recommendation['alternatives']),
             detailed_analysis=detailed_analysis
         )
     
@@ -183,7 +273,7 @@ class EnhancedHandEvaluator:
         has_ace = any(word in description for word in ['as', 'ace', 'a'])
         has_ten = any(word in description for word in ['10', 'dix', 'ten'])
         
-        trump_count = len(re.findall(r'(?:valet|jack|9|neuf|as|ace|10|dix|roi|king|dame|queen)', description))
+        trump_count = len(_TRUMP_CARD_PATTERN.findall(description))
         
         return {
             'has_jack': has_jack,
@@ -312,521 +402,67 @@ class ComprehensiveRulesDatabase:
     """Base de données complète des règles de Belote Contrée"""
     
     def __init__(self):
-        self.rules = self._initialize_comprehensive_rules()
-        
-    def _initialize_comprehensive_rules(self):
-        """Initialiser la base complète des règles"""
-        return {
-            # Règles d'annonces complètes
-            'announcement_rules_complete': {
-                'id': 'announcement_rules_complete',
-                'category': 'announcements',
-                'title_fr': '📢 Règles Complètes des Annonces',
-                'title_en': '📢 Complete Announcement Rules',
-                'content_fr': """**Système complet des annonces officielles:**
-
-**90 points:**
-• **Critère officiel:** 2 As minimum
-• Configuration de base acceptable
-• Stratégie défensive recommandée
-
-**100 points:**
-• **Critère officiel:** "Généralement comme tu veux"
-• Flexibilité maximale dans la composition
-• Main équilibrée appréciée
-
-**110 points:**
-• **CRITÈRE OBLIGATOIRE:** Atouts Complets
-• Être sûr de collecter toutes les cartes d'atout dès le début
-• **Configuration requise:** (Valet, 9, As, 10) minimum
-• **Alternative:** (Valet, 9, As, 2+ autres cartes d'atout)
-
-**120 points:**
-• **CRITÈRE STRICT:** Maximum 3 couleurs à la main + Atouts Complets
-• Les 3 couleurs peuvent être: cœurs, trèfle, carreau (+ atout)
-• **Cas particulier:** 6 cartes d'atout (dont Valet + 9) + 2 cartes de couleurs différentes
-
-**130 points:**
-• **CRITÈRE TRÈS STRICT:** Maximum 2 couleurs à la main + Atouts Complets
-• **Cas particulier:** 6 cartes d'atout (dont Valet + 9) + 2 cartes même couleur ≠ atout
-
-**140 points:**
-• **CRITÈRE EXTRÊME:** L'adversaire ne peut avoir qu'un seul pli maximum
-• Main quasi-parfaite obligatoire
-• Risque très élevé""",
-                'content_en': """**Complete official announcement system:**
-
-**90 points:**
-• **Official criterion:** Minimum 2 Aces
-• Basic acceptable configuration
-• Defensive strategy recommended
-
-**100 points:**
-• **Official criterion:** "Generally as you wish"
-• Maximum flexibility in composition
-• Balanced hand appreciated
-
-**110 points:**
-• **MANDATORY CRITERION:** Complete Trumps
-• Must be sure to collect all trump cards from start
-• **Required configuration:** (Jack, 9, Ace, 10) minimum
-• **Alternative:** (Jack, 9, Ace, 2+ other trump cards)
-
-**120 points:**
-• **STRICT CRITERION:** Maximum 3 colors in hand + Complete Trumps
-• The 3 colors can be: hearts, clubs, diamonds (+ trump)
-• **Special case:** 6 trump cards (including Jack + 9) + 2 cards of different colors
-
-**130 points:**
-• **VERY STRICT CRITERION:** Maximum 2 colors in hand + Complete Trumps
-• **Special case:** 6 trump cards (including Jack + 9) + 2 cards same color ≠ trump
-
-**140 points:**
-• **EXTREME CRITERION:** Opponent can have maximum one trick
-• Near-perfect hand mandatory
-• Very high risk""",
-                'keywords_fr': ['annonce', 'règle', 'regle', 'recommandation', '90', '100', '110', '120', '130', '140', 'atouts', 'complets', 'couleurs', 'officiel', 'comment', 'quand', 'que'],
-                'keywords_en': ['announcement', 'rule', 'recommendation', '90', '100', '110', '120', '130', '140', 'trumps', 'complete', 'colors', 'official', 'how', 'when', 'what'],
-                'query_variations_fr': [
-                    'règle annonce', 'regle annonce', 'règles annonces',
-                    'comment annoncer', 'quand annoncer', 'que annoncer',
-                    'recommandation annonce', 'critère annonce',
-                    'annonce 90', 'annonce 100', 'annonce 110', 'annonce 120', 'annonce 130', 'annonce 140'
-                ],
-                'query_variations_en': [
-                    'announcement rule', 'announce rule', 'bidding rule',
-                    'how to announce', 'when to announce', 'what to announce',
-                    'announcement recommendation', 'announcement criteria',
-                    'announce 90', 'announce 100', 'announce 110', 'announce 120', 'announce 130', 'announce 140'
-                ]
-            },
-            
-            # Système de calcul complet
-            'scoring_system_complete': {
-                'id': 'scoring_system_complete',
-                'category': 'scoring',
-                'title_fr': '🔢 Système de Calcul Complet',
-                'title_en': '🔢 Complete Scoring System',
-                'content_fr': """**Système officiel de calcul des scores:**
-
-**Points totaux possibles par manche:**
-• Points des cartes: 152
-• Dix de der (dernier pli): +10 points
-• **Total possible: 162 points**
-
-**Système de score spécial pour équipe non-preneuse:**
-Si score = 10×K + x:
-• Si x ∈ [5,6,7] → Score final = 10×(K+1)
-• Sinon → Score final = 10×K
-• Autre équipe: 160 - score calculé
-
-**Belote/Rebelote:**
-• +20 points si Roi et Dame d'atout chez même joueur
-• Annonce obligatoire pour obtenir les points
-
-**Échec de contrat:**
-• Équipe preneuse: 0 points
-• Équipe adverse: 160 + 20×(bonus belote)
-
-**Capot (tous les plis):**
-• 250 points automatiques
-• Si dans contrat: DOIT faire tous les plis
-
-**Coinche & Surcoinche:**
-• Contrat simple: ×1
-• Coinché: ×2
-• Surcoinché: ×4
-
-**Fin de partie:**
-• Premier à 1001 points remporte
-• Alternative: 2000 points selon accord""",
-                'content_en': """**Official scoring system:**
-
-**Total possible points per round:**
-• Card points: 152
-• Ten of last (last trick): +10 points
-• **Total possible: 162 points**
-
-**Special scoring system for non-taking team:**
-If score = 10×K + x:
-• If x ∈ [5,6,7] → Final score = 10×(K+1)
-• Otherwise → Final score = 10×K
-• Other team: 160 - calculated score
-
-**Belote/Rebelote:**
-• +20 points if King and Queen of trump with same player
-• Announcement mandatory to get points
-
-**Contract failure:**
-• Taking team: 0 points
-• Opposing team: 160 + 20×(belote bonus)
-
-**Capot (all tricks):**
-• 250 automatic points
-• If in contract: MUST make all tricks
-
-**Coinche & Surcoinche:**
-• Simple contract: ×1
-• Coinched: ×2
-• Surcoinched: ×4
-
-**Game end:**
-• First to 1001 points wins
-• Alternative: 2000 points by agreement""",
-                'keywords_fr': ['score', 'calcul', 'points', 'système', 'comptage', 'total', 'belote', 'rebelote', 'capot', 'coinche', 'fin'],
-                'keywords_en': ['score', 'calculation', 'points', 'system', 'counting', 'total', 'belote', 'rebelote', 'capot', 'coinche', 'end'],
-                'query_variations_fr': [
-                    'calcul score', 'calcul point', 'calculer points',
-                    'système score', 'comptage', 'total points',
-                    'comment compter', 'score final'
-                ],
-                'query_variations_en': [
-                    'score calculation', 'point calculation', 'calculate points',
-                    'scoring system', 'counting', 'total points',
-                    'how to count', 'final score'
-                ]
-            },
-            
-            # Ajout des points au partenaire
-            'partner_points_system': {
-                'id': 'partner_points_system',
-                'category': 'scoring',
-                'title_fr': '🤝 Système d\'Ajout de Points au Partenaire',
-                'title_en': '🤝 Partner Point Addition System',
-                'content_fr': """**Système officiel d'ajout de points au partenaire:**
-
-**Premier tour - Points d'atout:**
-• **Avec Valet ou 9 d'atout:** (nombre de cartes d'atout - 1) × 10 points
-• **Avec Valet seul:** +10 points
-• **Sans Valet ni 9:** +10 points si 3 atouts minimum
-• **Sinon:** Aucun ajout
-
-**Deuxième tour - Points d'As:**
-• **Ajout:** (nombre d'As × 10) points
-• **Série consécutive commençant par As:** +20 points
-  - Exemple: As-10-Roi = +20 points supplémentaires
-
-**Troisième tour - Capot (très rare):**
-• On cherche un capot potentiel
-• **Ajout si:**
-  - Vous avez des 10
-  - Vous pouvez couper des couleurs avec vos atouts
-• Évaluation situationnelle
-
-**Exemples pratiques:**
-• Main: Valet♠ 9♠ As♠ 7♠ + 4 autres → (4-1)×10 = 30 points
-• Main: As♥ As♦ 10♥ → 2×10 = 20 points + série possible
-• Main: As♣ 10♣ Roi♣ → 10 + 20 (série) = 30 points""",
-                'content_en': """**Official partner point addition system:**
-
-**First round - Trump points:**
-• **With Jack or 9 of trump:** (number of trump cards - 1) × 10 points
-• **With Jack alone:** +10 points
-• **Without Jack or 9:** +10 points if 3+ trumps
-• **Otherwise:** No addition
-
-**Second round - Ace points:**
-• **Addition:** (number of Aces × 10) points
-• **Consecutive series starting with Ace:** +20 points
-  - Example: Ace-10-King = +20 additional points
-
-**Third round - Capot (very rare):**
-• Looking for potential capot
-• **Addition if:**
-  - You have 10s
-  - You can cut colors with your trumps
-• Situational evaluation
-
-**Practical examples:**
-• Hand: Jack♠ 9♠ Ace♠ 7♠ + 4 others → (4-1)×10 = 30 points
-• Hand: Ace♥ Ace♦ 10♥ → 2×10 = 20 points + possible series
-• Hand: Ace♣ 10♣ King♣ → 10 + 20 (series) = 30 points""",
-                'keywords_fr': ['partenaire', 'ajout', 'points', 'valet', 'as', 'série', 'atout', 'tour', 'calcul'],
-                'keywords_en': ['partner', 'addition', 'points', 'jack', 'ace', 'series', 'trump', 'round', 'calculation'],
-                'query_variations_fr': [
-                    'ajout points partenaire', 'points partenaire', 'calcul partenaire',
-                    'système partenaire', 'bonus partenaire'
-                ],
-                'query_variations_en': [
-                    'partner points addition', 'partner points', 'partner calculation',
-                    'partner system', 'partner bonus'
-                ]
-            },
-            
-            # Coinche et Surcoinche détaillé
-            'coinche_system_detailed': {
-                'id': 'coinche_system_detailed',
-                'category': 'coinche',
-                'title_fr': '🎯 Système Coinche & Surcoinche Détaillé',
-                'title_en': '🎯 Detailed Coinche & Surcoinche System',
-                'content_fr': """**Système officiel Coinche & Surcoinche:**
-
-**Définitions:**
-• **Coinche:** Doubler les enjeux d'un contrat adverse
-• **Surcoinche:** Re-doubler après une coinche
-
-**Multiplicateurs:**
-• **Contrat simple:** ×1 (normal)
-• **Contrat coinché:** ×2
-• **Contrat surcoinché:** ×4
-
-**Quand coincher:**
-• Vous pensez que l'adversaire va chuter
-• Votre main est forte contre leur annonce
-• Vous avez des atouts dans leur couleur
-
-**Risques et gains:**
-• **Si adversaire chute:** Vous gagnez le double/quadruple
-• **Si adversaire réussit:** Il gagne le double/quadruple
-
-**Stratégie:**
-• Coinchez uniquement si très confiant
-• Attention aux contrats 90-100 (plus faciles)
-• Évitez de coincher les mains exceptionnelles
-
-**Exemples:**
-• Contrat 110♠ coinché qui chute: 110×2 = 220 points
-• Contrat 120♥ surcoinché réussi: 120×4 = 480 points
-
-**Conseil d'expert:**
-La coinche est une arme à double tranchant - utilisez-la avec parcimonie!""",
-                'content_en': """**Official Coinche & Surcoinche system:**
-
-**Definitions:**
-• **Coinche:** Double the stakes of an opponent's contract
-• **Surcoinche:** Re-double after a coinche
-
-**Multipliers:**
-• **Simple contract:** ×1 (normal)
-• **Coinched contract:** ×2
-• **Surcoinched contract:** ×4
-
-**When to coinche:**
-• You think opponent will fail
-• Your hand is strong against their announcement
-• You have trumps in their suit
-
-**Risks and gains:**
-• **If opponent fails:** You win double/quadruple
-• **If opponent succeeds:** They win double/quadruple
-
-**Strategy:**
-• Only coinche if very confident
-• Beware of 90-100 contracts (easier)
-• Avoid coinching exceptional hands
-
-**Examples:**
-• 110♠ contract coinched that fails: 110×2 = 220 points
-• 120♥ contract surcoinched that succeeds: 120×4 = 480 points
-
-**Expert advice:**
-Coinche is a double-edged sword - use it sparingly!""",
-                'keywords_fr': ['coinche', 'surcoinche', 'multiplicateur', 'doubler', 'enjeux', 'stratégie', 'risque'],
-                'keywords_en': ['coinche', 'surcoinche', 'multiplier', 'double', 'stakes', 'strategy', 'risk'],
-                'query_variations_fr': [
-                    'coinche surcoinche', 'multiplicateur', 'doubler contrat',
-                    'quand coincher', 'stratégie coinche'
-                ],
-                'query_variations_en': [
-                    'coinche surcoinche', 'multiplier', 'double contract',
-                    'when to coinche', 'coinche strategy'
-                ]
-            },
-            
-            # Belote Rebelote détaillé
-            'belote_rebelote_detailed': {
-                'id': 'belote_rebelote_detailed',
-                'category': 'bonus',
-                'title_fr': '👑 Belote & Rebelote - Guide Complet',
-                'title_en': '👑 Belote & Rebelote - Complete Guide',
-                'content_fr': """**Guide complet Belote & Rebelote:**
-
-**Définition officielle:**
-• Avoir le Roi ET la Dame d'atout chez le même joueur
-• Bonus: +20 points à l'équipe
-• **Annonce OBLIGATOIRE** pour obtenir les points
-
-**Procédure d'annonce:**
-1. Annoncez "Belote" en jouant la première carte (Roi ou Dame)
-2. Annoncez "Rebelote" en jouant la seconde carte
-3. L'ordre Roi→Dame ou Dame→Roi n'importe pas
-
-**Règles importantes:**
-• Si oubli d'annoncer = PAS de bonus (0 points)
-• Peut être joué à tout moment du jeu
-• Valable uniquement si les deux cartes chez même joueur
-• Ne peut pas être coinché/surcoinché
-
-**Stratégies d'utilisation:**
-• **Conservation:** Gardez pour moments cruciaux
-• **Timing:** Jouez au bon moment pour remporter plis importants
-• **Coordination:** Informez discrètement votre partenaire
-• **Psychological:** Peut déstabiliser les adversaires
-
-**Impact sur le score:**
-• +20 points comptent dans le calcul final
-• Peut faire la différence dans un contrat serré
-• Compte même en cas de chute de contrat
-
-**Exemples tactiques:**
-• Utilisez pour prendre un pli de 10
-• Gardez pour couper une couleur forte adverse
-• Jouez en fin de partie pour sécuriser la victoire""",
-                'content_en': """**Complete Belote & Rebelote guide:**
-
-**Official definition:**
-• Having King AND Queen of trump with same player
-• Bonus: +20 points to the team
-• **MANDATORY announcement** to get points
-
-**Announcement procedure:**
-1. Announce "Belote" when playing first card (King or Queen)
-2. Announce "Rebelote" when playing second card
-3. King→Queen or Queen→King order doesn't matter
-
-**Important rules:**
-• If forgotten to announce = NO bonus (0 points)
-• Can be played anytime during game
-• Valid only if both cards with same player
-• Cannot be coinched/surcoinched
-
-**Usage strategies:**
-• **Conservation:** Keep for crucial moments
-• **Timing:** Play at right time to win important tricks
-• **Coordination:** Discretely inform your partner
-• **Psychological:** Can destabilize opponents
-
-**Score impact:**
-• +20 points count in final calculation
-• Can make difference in tight contract
-• Counts even if contract fails
-
-**Tactical examples:**
-• Use to take a trick with 10
-• Keep to cut strong opponent suit
-• Play late game to secure victory""",
-                'keywords_fr': ['belote', 'rebelote', 'roi', 'dame', 'atout', 'bonus', '20', 'points', 'annoncer', 'utiliser', 'stratégie'],
-                'keywords_en': ['belote', 'rebelote', 'king', 'queen', 'trump', 'bonus', '20', 'points', 'announce', 'use', 'strategy'],
-                'query_variations_fr': [
-                    'belote rebelote', 'roi dame atout', 'bonus 20 points',
-                    'quand utiliser belote', 'comment belote', 'stratégie belote'
-                ],
-                'query_variations_en': [
-                    'belote rebelote', 'king queen trump', 'bonus 20 points',
-                    'when use belote', 'how belote', 'belote strategy'
-                ]
-            },
-            
-            # Règles du Capot
-            'capot_rules_complete': {
-                'id': 'capot_rules_complete',
-                'category': 'capot',
-                'title_fr': '🏆 Règles Complètes du Capot',
-                'title_en': '🏆 Complete Capot Rules',
-                'content_fr': """**Règles officielles du Capot:**
-
-**Définition:**
-• Faire TOUS les plis (8 plis sur 8)
-• Score automatique: 250 points
-• Remplace le calcul normal des points
-
-**Types de Capot:**
-
-**1. Capot dans le contrat:**
-• Annonce explicite: "Capot Cœur"
-• **OBLIGATION:** Doit faire TOUS les plis
-• Si échoue (même 7 plis sur 8): Chute totale
-• Si réussit: 250 points
-
-**2. Capot surprise:**
-• Non annoncé mais réalisé
-• Remplace automatiquement le contrat initial
-• 250 points garantis
-
-**Stratégies pour le Capot:**
-
-**Conditions favorables:**
-• Main exceptionnelle avec nombreux atouts
-• Contrôle de plusieurs couleurs
-• Partenaire fort probable
-
-**Risques:**
-• Très difficile à réaliser
-• Un seul pli perdu = échec total
-• Adversaires vont tout tenter pour prendre 1 pli
-
-**Défense contre le Capot:**
-• Conservez vos cartes fortes
-• Tentez de prendre au moins 1 pli
-• Coordination défensive avec partenaire
-
-**Exemples de mains à Capot:**
-• 6-7 atouts forts + As/10 dans autres couleurs
-• Contrôle total d'une couleur + atouts complets
-• Main quasi-parfaite avec domination évidente
-
-**Conseil d'expert:**
-Le Capot est spectaculaire mais très risqué - n'annoncez que si quasi-certain!""",
-                'content_en': """**Official Capot rules:**
-
-**Definition:**
-• Make ALL tricks (8 out of 8)
-• Automatic score: 250 points
-• Replaces normal point calculation
-
-**Types of Capot:**
-
-**1. Capot in contract:**
-• Explicit announcement: "Capot Hearts"
-• **OBLIGATION:** Must make ALL tricks
-• If fails (even 7 out of 8): Total failure
-• If succeeds: 250 points
-
-**2. Surprise Capot:**
-• Not announced but achieved
-• Automatically replaces initial contract
-• 250 guaranteed points
-
-**Capot strategies:**
-
-**Favorable conditions:**
-• Exceptional hand with many trumps
-• Control of several suits
-• Probably strong partner
-
-**Risks:**
-• Very difficult to achieve
-• One lost trick = total failure
-• Opponents will try everything for 1 trick
-
-**Defense against Capot:**
-• Keep your strong cards
-• Try to take at least 1 trick
-• Defensive coordination with partner
-
-**Capot hand examples:**
-• 6-7 strong trumps + Ace/10 in other suits
-• Total control of one suit + complete trumps
-• Near-perfect hand with obvious domination
-
-**Expert advice:**
-Capot is spectacular but very risky - only announce if almost certain!""",
-                'keywords_fr': ['capot', 'tous', 'plis', '250', 'points', 'risque', 'stratégie', 'annoncer'],
-                'keywords_en': ['capot', 'all', 'tricks', '250', 'points', 'risk', 'strategy', 'announce'],
-                'query_variations_fr': [
-                    'capot', 'tous les plis', '250 points', 'règles capot',
-                    'quand capot', 'stratégie capot', 'risque capot'
-                ],
-                'query_variations_en': [
-                    'capot', 'all tricks', '250 points', 'capot rules',
-                    'when capot', 'capot strategy', 'capot risk'
-                ]
+        self.rules = load_rules()
+        
+        # Empreinte du contenu des règles (clé de cache des embeddings)
+        self.rules_hash = hashlib.blake2b(
+            json.dumps(self.rules, sort_keys=True).encode('utf-8'), digest_size=16
+        ).hexdigest()
+        
+        # Ensembles de mots-clés (minuscules, internés) précalculés par règle et par langue
+        self.keyword_sets = {
+            language: {
+                rule_id: frozenset(sys.intern(kw.lower()) for kw in rule.get(f'keywords_{language}', []))
+                for rule_id, rule in self.rules.items()
             }
+            for language in ('fr', 'en')
         }
-    
+        
+        # Index inversé mot-clé -> règles, par langue
+        self.keyword_index = {language: {} for language in self.keyword_sets}
+        for language, rule_keywords in self.keyword_sets.items():
+            for rule_id, keywords in rule_keywords.items():
+                for keyword in keywords:
+                    self.keyword_index[language].setdefault(keyword, set()).add(rule_id)
+        
+        # Matrice d'incidence règles x vocabulaire (lignes dans l'ordre des règles) et taille de chaque ensemble
+        self.keyword_vocab = {}
+        self.keyword_matrix = {}
+        self.keyword_counts = {}
+        for language, rule_keywords in self.keyword_sets.items():
+            vocab = {keyword: column for column, keyword in enumerate(self.keyword_index[language])}
+            matrix = np.zeros((len(rule_keywords), len(vocab)), dtype=np.float64)
+            for row, keywords in enumerate(rule_keywords.values()):
+                matrix[row, [vocab[keyword] for keyword in keywords]] = 1.0
+            self.keyword_vocab[language] = vocab
+            self.keyword_matrix[language] = matrix
+            self.keyword_counts[language] = np.array([len(keywords) for keywords in rule_keywords.values()], dtype=np.float64)
+        
     def get_all_rules(self):
         """Retourner toutes les règles"""
         return self.rules
+    
+    def keyword_coverage(self, keywords: Set[str], language: str) -> np.ndarray:
+        """Part des mots-clés de chaque règle présents dans la requête (ordre des règles)"""
+        if language not in self.keyword_matrix:
+            return np.zeros(len(self.rules))
+        vocab = self.keyword_vocab[language]
+        columns = [vocab[keyword] for keyword in keywords if keyword in vocab]
+        hits = self.keyword_matrix[language][:, columns].sum(axis=1)
+        counts = self.keyword_counts[language]
+        return np.divide(hits, counts, out=np.zeros_like(hits), where=counts > 0)
+    
+    def score_rules_by_keywords(self, keywords: Set[str], language: str) -> Dict[str, float]:
+        """Scorer les règles par spécificité des mots-clés trouvés (un mot-clé partagé par k règles vaut 1/k)"""
+        index = self.keyword_index.get(language, {})
+        scores: Dict[str, float] = {}
+        for keyword in keywords:
+            rule_ids = index.get(keyword)
+            if rule_ids:
+                weight = 1.0 / len(rule_ids)
+                for rule_id in rule_ids:
+                    scores[rule_id] = scores.get(rule_id, 0.0) + weight
+        return scores
 
 class FuzzyMatcher:
     """Matcher flou pour gérer les variations et typos"""
@@ -835,573 +471,265 @@ class FuzzyMatcher:
         self.min_similarity = 0.6
         self.exact_match_bonus = 0.3
         
-    def find_best_matches(self, query: str, candidates: List[str], top_k: int = 3) -> List[Tuple[str, float]]:
-        """Trouver les meilleures correspondances floues"""
+    def preprocess(self, text: str) -> str:
+        """Prétraiter un texte pour le matching (minuscules, ponctuation retirée)"""
+        if DEPENDENCIES_AVAILABLE:
+            return default_process(text)
+        return text.lower().strip()
+    
+    def find_best_matches(self, query: str, candidates: List[str], top_k: int = 3,
+                          preprocessed: bool = False) -> List[Tuple[str, float, int]]:
+        """Trouver les meilleures correspondances floues (texte, score, index du candidat)"""
+        # preprocessed=True: candidats déjà passés par preprocess, seule la requête l'est ici
         if not DEPENDENCIES_AVAILABLE:
-            return [(query, 1.0)]
+            # Sans RapidFuzz, seule une correspondance exacte est retenue
+            if preprocessed:
+                query = self.preprocess(query)
+            return [(candidate, 1.0, i) for i, candidate in enumerate(candidates) if candidate == query][:1]
             
         try:
-            # Utiliser fuzzywuzzy pour le matching
-            matches = process.extract(query, candidates, limit=top_k, scorer=fuzz.token_sort_ratio)
+            # Utiliser RapidFuzz (C++) pour le matching, seuil appliqué pendant le scan
+            if preprocessed:
+                matches = process.extract(
+                    self.preprocess(query), candidates, limit=top_k, scorer=fuzz.token_sort_ratio,
+                    processor=None, score_cutoff=self.min_similarity * 100
+                )
+            else:
+                matches = process.extract(
+                    query, candidates, limit=top_k, scorer=fuzz.token_sort_ratio,
+                    processor=default_process, score_cutoff=self.min_similarity * 100
+                )
             
             # Convertir en format standard
-            results = []
-            for match, score in matches:
-                normalized_score = score / 100.0
-                if normalized_score >= self.min_similarity:
-                    results.append((match, normalized_score))
-            
-            return results
+            return [(match, score / 100.0, index) for match, score, index in matches]
         except Exception:
             # Fallback vers matching simple
             results = []
             query_lower = query.lower()
             
-            for candidate in candidates:
+            for i, candidate in enumerate(candidates):
                 similarity = SequenceMatcher(None, query_lower, candidate.lower()).ratio()
                 if similarity >= self.min_similarity:
-                    results.append((candidate, similarity))
+                    results.append((candidate, similarity, i))
             
-            results.sort(key=lambda x: x[1], reverse=True)
-            return results[:top_k]
+            # Sélection partielle des top_k au lieu d'un tri complet
+            return heapq.nlargest(top_k, results, key=itemgetter(1))
+
+def _compile_patterns(patterns: Dict[str, List[str]]) -> Dict[str, _CompiledPattern]:
+    """Fusionner les motifs de chaque langue (et les motifs communs 'neutral') en une seule alternative compilée"""
+    neutral = patterns.get('neutral', [])
+    return {
+        lang: _re_engine.compile('|'.join(f'(?:{p})' for p in neutral + pats))
+        for lang, pats in patterns.items() if lang != 'neutral'
+    }
 
-class EnhancedSofieneAI:
-    """Sofiene AI amélioré avec compréhension linguistique avancée"""
-    
-    def __init__(self):
-        self.model = load_sentence_transformer()
-        self.rules_db = ComprehensiveRulesDatabase()
-        self.hand_evaluator = EnhancedHandEvaluator()
-        self.language_processor = LanguageProcessor()
-        self.fuzzy_matcher = FuzzyMatcher()
-        self.rule_embeddings = {}  # Will be set after instantiation
-        self.context_window = 5
-        
-        # Cache pour améliorer les performances
-        self.query_cache = {}
-        self.max_cache_size = 100
-        # Do NOT call initialize_embeddings here (Streamlit cache issue)
-        # if self.model:
-        #     self.initialize_embeddings()
-    
-    @st.cache_data
-    def initialize_embeddings(_self):
-        """Initialiser les embeddings avec cache"""
-        embeddings_file = 'sofiene_enhanced_embeddings.pkl'
-        
-        if os.path.exists(embeddings_file):
-            try:
-                with open(embeddings_file, 'rb') as f:
-                    return pickle.load(f)
-            except Exception:
-                return _self.compute_embeddings()
-        else:
-            return _self.compute_embeddings()
-    
-    def compute_embeddings(self):
-        """Calculer les embeddings pour toutes les règles"""
-        if not self.model:
-            return {}
-            
-        try:
-            embeddings = {}
-            with st.spinner("Initialisation de l'expertise Sofiene améliorée..."):
-                progress_bar = st.progress(0)
-                rules = self.rules_db.get_all_rules()
-                total_rules = len(rules)
-                
-                for i, (rule_id, rule) in enumerate(rules.items()):
-                    # Texte français enrichi
-                    text_fr = f"{rule['title_fr']} {rule['content_fr']} {' '.join(rule['keywords_fr'])}"
-                    if 'query_variations_fr' in rule:
-                        text_fr += f" {' '.join(rule['query_variations_fr'])}"
-                    
-                    # Texte anglais enrichi
-                    text_en = f"{rule['title_en']} {rule['content_en']} {' '.join(rule['keywords_en'])}"
-                    if 'query_variations_en' in rule:
-                        text_en += f" {' '.join(rule['query_variations_en'])}"
-                    
-                    embedding_fr = self.model.encode(text_fr)
-                    embedding_en = self.model.encode(text_en)
-                    
-                    embeddings[rule_id] = {
-                        'fr': embedding_fr,
-                        'en': embedding_en,
-                        'rule': rule
-                    }
-                    
-                    progress_bar.progress((i + 1) / total_rules)
-                
-                progress_bar.empty()
-                
-                # Sauvegarder les embeddings
-                try:
-                    with open('sofiene_enhanced_embeddings.pkl', 'wb') as f:
-                        pickle.dump(embeddings, f)
-                except Exception:
-                    pass
-                    
-            return embeddings
-        except Exception as e:
-            st.error(f"Erreur de traitement: {str(e)}")
-            return {}
-    
-    def process_query_enhanced(self, query: str, language: str = 'fr', context: List[str] = None) -> str:
-        """Traitement de requête amélioré avec cache et fallbacks multiples"""
-        
-        # Vérifier le cache
-        cache_key = f"{query}_{language}"
-        if cache_key in self.query_cache:
-            return self.query_cache[cache_key]
-        
-        # Normaliser la requête
-        normalized_query = self.language_processor.normalize_query(query, language)
-        
-        # Essayer différentes approches dans l'ordre
-        response = None
-        
-        # 1. Patterns spécifiques améliorés
-        response = self.handle_enhanced_patterns(query, language)
-        if response:
-            self._cache_response(cache_key, response)
-            return response
-        
-        # 2. Recherche sémantique
-        if self.model and self.rule_embeddings:
-            response = self.semantic_search_enhanced(normalized_query, language)
-            if response:
-                self._cache_response(cache_key, response)
-                return response
-        
-        # 3. Matching flou
-        response = self.fuzzy_search(normalized_query, language)
-        if response:
-            self._cache_response(cache_key, response)
-            return response
-        
-        # 4. Fallback intelligent
-        response = self.intelligent_fallback(query, language, context)
-        self._cache_response(cache_key, response)
-        return response
-    
-    def handle_enhanced_patterns(self, query: str, language: str = 'fr') -> Optional[str]:
-        """Gestion améliorée des patterns spécifiques"""
-        query_lower = query.lower().strip()
-        
-        # Patterns d'évaluation de main améliorés
-        hand_patterns = {
-            'fr': [
-                r'j.ai.*(?:valet|9|as|10|roi|dame).*(?:annoncer|conseiller)',
-                r'(?:main|cartes?).*(?:annoncer|recommandation)',
-                r'(?:que|quoi|combien).*annoncer.*(?:avec|main)',
-                r'évaluer.*main', r'analyser.*main'
-            ],
-            'en': [
-                r'i.have.*(?:jack|9|ace|10|king|queen).*(?:announce|recommend)',
-                r'(?:hand|cards?).*(?:announce|recommendation)',
-                r'(?:what|how much).*announce.*(?:with|hand)',
-                r'evaluate.*hand', r'analyze.*hand'
-            ]
-        }
-        
-        patterns = hand_patterns.get(language, hand_patterns['fr'])
-        for pattern in patterns:
-            if re.search(pattern, query_lower):
-                return self.handle_hand_evaluation_enhanced(query, language)
-        
-        # Patterns d'annonces avec extraction de points
-        points_extracted = self.extract_points_from_query(query_lower)
-        if points_extracted:
-            for points in points_extracted:
-                if 90 <= points <= 140:
-                    if any(word in query_lower for word in ['recommandation', 'recommendation', 'conseil', 'advice']):
-                        return self.get_announcement_recommendation_enhanced(points, language)
-                    elif any(word in query_lower for word in ['quand', 'when', 'comment', 'how']):
-                        return self.get_announcement_conditions_enhanced(points, language)
-        
-        # Patterns Belote/Rebelote améliorés
-        belote_patterns = {
-            'fr': [
-                r'belote.*rebelote', r'roi.*dame.*atout', r'bonus.*20',
-                r'(?:quand|comment).*(?:utiliser|jouer).*belote',
-                r'stratégie.*belote', r'belote.*stratégie'
-            ],
-            'en': [
-                r'belote.*rebelote', r'king.*queen.*trump', r'bonus.*20',
-                r'(?:when|how).*(?:use|play).*belote',
-                r'strategy.*belote', r'belote.*strategy'
-            ]
-        }
-        
-        patterns = belote_patterns.get(language, belote_patterns['fr'])
-        for pattern in patterns:
-            if re.search(pattern, query_lower):
-                return self.get_belote_detailed_info(language)
-        
-        # Patterns Coinche/Surcoinche
-        coinche_patterns = {
-            'fr': [
-                r'coinche.*surcoinche', r'multiplicateur', r'doubler.*contrat',
-                r'(?:quand|comment).*coincher', r'stratégie.*coinche'
-            ],
-            'en': [
-                r'coinche.*surcoinche', r'multiplier', r'double.*contract',
-                r'(?:when|how).*coinche', r'strategy.*coinche'
-            ]
-        }
-        
-        patterns = coinche_patterns.get(language, coinche_patterns['fr'])
-        for pattern in patterns:
-            if re.search(pattern, query_lower):
-                return self.get_coinche_detailed_info(language)
-        
-        # Patterns Capot
-        capot_patterns = {
-            'fr': [
-                r'capot', r'tous.*plis', r'250.*points',
-                r'(?:quand|comment).*capot', r'stratégie.*capot'
-            ],
-            'en': [
-                r'capot', r'all.*tricks', r'250.*points',
-                r'(?:when|how).*capot', r'strategy.*capot'
-            ]
-        }
-        
-        patterns = capot_patterns.get(language, capot_patterns['fr'])
-        for pattern in patterns:
-            if re.search(pattern, query_lower):
-                return self.get_capot_detailed_info(language)
-        
+# Patterns d'évaluation de main (quantificateurs paresseux: seule la présence d'un match compte)
+_HAND_PATTERNS = _compile_patterns({
+    'fr': [
+        r'j.ai.*?(?:valet|9|as|10|roi|dame).*?(?:annoncer|conseiller)',
+        r'(?:main|cartes?).*?(?:annoncer|recommandation)',
+        r'(?:que|quoi|combien).*?annoncer.*?(?:avec|main)',
+        r'évaluer.*?main', r'analyser.*?main'
+    ],
+    'en': [
+        r'i.have.*?(?:jack|9|ace|10|king|queen).*?(?:announce|recommend)',
+        r'(?:hand|cards?).*?(?:announce|recommendation)',
+        r'(?:what|how much).*?announce.*?(?:with|hand)',
+        r'evaluate.*?hand', r'analyze.*?hand'
+    ]
+})
+
+# Patterns Belote/Rebelote
+_BELOTE_PATTERNS = _compile_patterns({
+    'neutral': [r'belote.*?rebelote', r'bonus.*?20'],
+    'fr': [
+        r'roi.*?dame.*?atout',
+        r'(?:quand|comment).*?(?:utiliser|jouer).*?belote',
+        r'stratégie.*?belote', r'belote.*?stratégie'
+    ],
+    'en': [
+        r'king.*?queen.*?trump',
+        r'(?:when|how).*?(?:use|play).*?belote',
+        r'strategy.*?belote', r'belote.*?strategy'
+    ]
+})
+
+# Patterns Coinche/Surcoinche
+_COINCHE_PATTERNS = _compile_patterns({
+    'neutral': [r'coinche.*?surcoinche'],
+    'fr': [
+        r'multiplicateur', r'doubler.*?contrat',
+        r'(?:quand|comment).*?coincher', r'stratégie.*?coinche'
+    ],
+    'en': [
+        r'multiplier', r'double.*?contract',
+        r'(?:when|how).*?coinche', r'strategy.*?coinche'
+    ]
+})
+
+# Patterns Capot
+_CAPOT_PATTERNS = _compile_patterns({
+    'neutral': [r'capot', r'250.*?points'],
+    'fr': [r'tous.*?plis', r'(?:quand|comment).*?capot', r'stratégie.*?capot'],
+    'en': [r'all.*?tricks', r'(?:when|how).*?capot', r'strategy.*?capot']
+})
+
+# Union nommée de toutes les catégories: un seul scan écarte les requêtes sans motif.
+# lastgroup donne la catégorie du match le plus à gauche, pas la plus prioritaire: l'ordre
+# hand > belote > coinche > capot ne départage qu'une même position, et une catégorie prioritaire
+# peut encore correspondre plus loin. _route_query reteste donc les catégories dans l'ordre.
+_ROUTING_PATTERNS = {
+    lang: _re_engine.compile('|'.join(
+        f'(?P<{category}>{patterns[lang].pattern})'
+        for category, patterns in (('hand', _HAND_PATTERNS), ('belote', _BELOTE_PATTERNS),
+                                   ('coinche', _COINCHE_PATTERNS), ('capot', _CAPOT_PATTERNS))
+    ))
+    for lang in _HAND_PATTERNS
+}
+
+# Table de routage des réponses détaillées (ordre de priorité): catégorie, motif compilé -> méthode de réponse
+_DETAIL_ROUTES = {
+    lang: (
+        ('belote', _BELOTE_PATTERNS[lang], 'get_belote_detailed_info'),
+        ('coinche', _COINCHE_PATTERNS[lang], 'get_coinche_detailed_info'),
+        ('capot', _CAPOT_PATTERNS[lang], 'get_capot_detailed_info')
+    )
+    for lang in _HAND_PATTERNS
+}
+
+# Mots déclencheurs de chaque intention (ensembles figés, testés contre les mots-clés de la requête)
+_BELOTE_INTENT_WORDS = frozenset(('belote', 'rebelote', 'roi', 'dame', 'king', 'queen'))
+_COINCHE_INTENT_WORDS = frozenset(('coinche', 'surcoinche', 'multiplicateur', 'multiplier'))
+_CAPOT_INTENT_WORDS = frozenset(('capot', 'tous', 'plis', 'all', 'tricks'))
+_HAND_INTENT_WORDS = frozenset(('main', 'hand', 'évaluer', 'evaluate', 'analyser', 'analyze'))
+_ANNOUNCEMENT_INTENT_WORDS = frozenset(('annonce', 'announcement', 'recommandation', 'recommendation'))
+_SCORING_INTENT_WORDS = frozenset(('score', 'calcul', 'calculation', 'points'))
+
+# Intentions par ordre de priorité décroissante
+_INTENT_PRIORITY = (
+    ('belote_rebelote', _BELOTE_INTENT_WORDS),
+    ('coinche', _COINCHE_INTENT_WORDS),
+    ('capot', _CAPOT_INTENT_WORDS),
+    ('hand_evaluation', _HAND_INTENT_WORDS),
+    ('announcement_rules', _ANNOUNCEMENT_INTENT_WORDS),
+    ('scoring', _SCORING_INTENT_WORDS)
+)
+
+# Index inversé mot -> rang de la plus haute priorité qui le contient (parcours inversé: la priorité haute écrase)
+_INTENT_BY_WORD = {
+    word: rank
+    for rank, (_, words) in reversed(tuple(enumerate(_INTENT_PRIORITY)))
+    for word in words
+}
+
+# Points d'annonce reconnus (90 à 140)
+_POINTS_PATTERN = re.compile(r'\b(90|100|110|120|130|140)\b')
+
+# Déclencheurs (sous-chaînes) des réponses sur un nombre de points
+_RECOMMENDATION_TRIGGER = re.compile(r'recommandation|recommendation|conseil|advice')
+_CONDITIONS_TRIGGER = re.compile(r'quand|when|comment|how')
+
+# Table de routage des réponses sur un nombre de points: déclencheur -> méthode de réponse
+_POINTS_ROUTES = (
+    (_RECOMMENDATION_TRIGGER, 'get_announcement_recommendation_enhanced'),
+    (_CONDITIONS_TRIGGER, 'get_announcement_conditions_enhanced')
+)
+
+def _route_cache_size(default: int = 1024) -> int:
+    """Taille du cache de routage lue dans SOFIENE_ROUTE_CACHE_SIZE (valeur par défaut si elle est invalide)"""
+    value = os.environ.get('SOFIENE_ROUTE_CACHE_SIZE')
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logging.getLogger(__name__).warning(
+            "SOFIENE_ROUTE_CACHE_SIZE=%r n'est pas un entier, taille par défaut utilisée (%d)", value, default
+        )
+        return default
+
+# Taille du cache de routage (SOFIENE_ROUTE_CACHE_SIZE=0 pour le désactiver)
+_ROUTE_CACHE_SIZE = _route_cache_size()
+
+@lru_cache(maxsize=_ROUTE_CACHE_SIZE)
+def _route_query(query_lower: str, language: str) -> Optional[Tuple[str, Tuple[int, ...]]]:
+    """Choisir la méthode de réponse d'une requête (fonction pure, mémoïsée): (méthode, arguments) ou None"""
+    # Aucun motif ni nombre de points: inutile de tester chaque catégorie
+    points_match = _POINTS_PATTERN.search(query_lower)
+    routing_match = _ROUTING_PATTERNS.get(language, _ROUTING_PATTERNS['fr']).search(query_lower)
+    if not points_match and not routing_match:
         return None
     
-    def extract_points_from_query(self, query: str) -> List[int]:
-        """Extraire les points mentionnés dans une requête"""
-        points = []
-        # Chercher les nombres entre 90 et 140
-        matches = re.findall(r'\b(90|100|110|120|130|140)\b', query)
-        for match in matches:
-            points.append(int(match))
-        return points
-    
-    def semantic_search_enhanced(self, query: str, language: str = 'fr') -> Optional[str]:
-        """Recherche sémantique améliorée"""
-        try:
-            query_embedding = self.model.encode(query)
-            matches = []
-            
-            # Extraire les mots-clés de la requête
-            query_keywords = self.language_processor.extract_keywords(query, language)
-            
-            for rule_id, rule_data in self.rule_embeddings.items():
-                rule_embedding = rule_data[language]
-                rule = rule_data['rule']
-                
-                # Similarité sémantique
-                similarity = cosine_similarity([query_embedding], [rule_embedding])[0][0]
-                
-                # Boost basé sur les mots-clés
-                keyword_boost = self.calculate_keyword_boost(query_keywords, rule, language)
-                similarity += keyword_boost
-                
-                # Boost basé sur les variations de requête
-                variation_boost = self.calculate_variation_boost(query, rule, language)
-                similarity += variation_boost
-                
-                matches.append(RuleMatch(
-                    rule_id=rule_id,
-                    score=similarity,
-                    rule_data=rule,
-                    match_type="semantic"
-                ))
-            
-            matches.sort(key=lambda x: x.score, reverse=True)
-            
-            if matches and matches[0].score > 0.3:
-                return self.generate_enhanced_response(matches[:3], query, language)
-                
-        except Exception as e:
-            st.warning(f"Erreur de recherche sémantique: {str(e)}")
-        
-        return None
+    # Catégorie déjà confirmée par le scan d'union: inutile de la rechercher à nouveau
+    matched_category = routing_match.lastgroup if routing_match else None
     
-    def calculate_keyword_boost(self, query_keywords: Set[str], rule: Dict, language: str) -> float:
-        """Calculer le boost basé sur les mots-clés"""
-        rule_keywords = set(rule.get(f'keywords_{language}', []))
-        
-        # Intersection des mots-clés
-        common_keywords = query_keywords.intersection(rule_keywords)
-        
-        if not rule_keywords:
-            return 0
-        
-        # Score basé sur le pourcentage de mots-clés communs
-        keyword_score = len(common_keywords) / len(rule_keywords)
-        
-        # Boost maximal de 0.4
-        return min(keyword_score * 0.4, 0.4)
+    # Patterns d'évaluation de main améliorés
+    if matched_category == 'hand' or _HAND_PATTERNS.get(language, _HAND_PATTERNS['fr']).search(query_lower):
+        return 'handle_hand_evaluation_enhanced', ()
     
-    def calculate_variation_boost(self, query: str, rule: Dict, language: str) -> float:
-        """Calculer le boost basé sur les variations de requête"""
-        query_lower = query.lower()
-        variations = rule.get(f'query_variations_{language}', [])
-        
-        max_boost = 0
-        for variation in variations:
-            similarity = self.language_processor.calculate_similarity(query_lower, variation.lower())
-            if similarity > 0.7:  # Seuil de similarité
-                max_boost = max(max_boost, similarity * 0.3)
-        
-        return max_boost
+    # Patterns d'annonces avec extraction de points
+    # (_POINTS_PATTERN ne capture que 90 à 140: le premier nombre trouvé décide)
+    if points_match:
+        points = int(points_match.group(1))
+        for trigger, handler in _POINTS_ROUTES:
+            if trigger.search(query_lower):
+                return handler, (points,)
     
-    def fuzzy_search(self, query: str, language: str = 'fr') -> Optional[str]:
-        """Recherche floue comme fallback"""
-        try:
-            # Construire la liste des variations de requête
-            all_variations = []
-            for rule_id, rule_data in self.rule_embeddings.items():
-                rule = rule_data['rule']
-                variations = rule.get(f'query_variations_{language}', [])
-                for variation in variations:
-                    all_variations.append((variation, rule_id, rule))
-            
-            # Chercher les meilleures correspondances floues
-            variation_texts = [v[0] for v in all_variations]
-            fuzzy_matches = self.fuzzy_matcher.find_best_matches(query, variation_texts, top_k=3)
-            
-            if fuzzy_matches and fuzzy_matches[0][1] > 0.7:
-                # Trouver la règle correspondante
-                best_variation = fuzzy_matches[0][0]
-                for variation, rule_id, rule in all_variations:
-                    if variation == best_variation:
-                        match = RuleMatch(
-                            rule_id=rule_id,
-                            score=fuzzy_matches[0][1],
-                            rule_data=rule,
-                            match_type="fuzzy"
-                        )
-                        return self.generate_enhanced_response([match], query, language)
-            
-        except Exception as e:
-            st.warning(f"Erreur de recherche floue: {str(e)}")
-        
-        return None
+    # Patterns Belote/Rebelote, Coinche/Surcoinche puis Capot
+    for category, pattern, handler in _DETAIL_ROUTES.get(language, _DETAIL_ROUTES['fr']):
+        if category == matched_category or pattern.search(query_lower):
+            return handler, ()
     
-    def intelligent_fallback(self, query: str, language: str = 'fr', context: List[str] = None) -> str:
-        """Fallback intelligent basé sur l'intention"""
-        intent = self.extract_intent_enhanced(query, language)
-        
-        fallbacks = {
-            'fr': {
-                'announcement_rules': """Je peux vous expliquer les règles d'annonces complètes:
+    return None
 
-**Recommandations officielles:**
-• **90 points:** 2 As minimum
-• **100 points:** "Généralement comme tu veux"
-• **110 points:** Atouts complets obligatoires
-• **120 points:** Max 3 couleurs + atouts complets
-• **130 points:** Max 2 couleurs + atouts complets
-• **140 points:** Adversaire max 1 pli
+# Recommandations d'annonces par langue et par nombre de points (construites une seule fois)
+_ANNOUNCEMENT_RECOMMENDATIONS = {
+    'fr': {
+        90: """**📢 Recommandation officielle pour 90 points**
 
-Précisez votre question pour une réponse plus détaillée!""",
-                
-                'hand_evaluation': """Pour évaluer votre main, décrivez-moi vos cartes précisément:
+**Critère obligatoire:** 2 As minimum
 
-**Format recommandé:**
-"J'ai Valet, 9, As de carreau, plus 10 de cœur, Roi de trèfle..."
+**Configuration détaillée:**
+• Main relativement faible mais jouable
+• Au moins 2 As dans votre jeu (n'importe quelle couleur)
+• Stratégie défensive acceptable
+• Risque modéré
 
-**Je peux analyser:**
-• Votre potentiel d'annonce
-• Les risques et opportunités
-• La stratégie optimale
-• Les alternatives possibles
+**Exemples de mains conformes:**
+• As♠ As♥ + 6 autres cartes diverses
+• As♦ As♣ + cartes moyennes
+• As♠ As♦ + quelques figures
 
-Décrivez votre main et je vous donnerai une analyse experte!""",
-                
-                'scoring': """Le système de score de la Belote Contrée suit des règles précises:
+**💡 Conseil Sofiene:**
+Annonce sûre et recommandée pour débuter. Idéale quand vous n'êtes pas sûr de votre main.""",
+        
+        100: """**📢 Recommandation officielle pour 100 points**
 
-**Points par manche:** 162 total (152 cartes + 10 dix de der)
-**Belote/Rebelote:** +20 points
-**Capot:** 250 points automatiques
-**Coinche:** ×2, Surcoinche: ×4
+**Critère officiel:** "Généralement comme tu veux"
 
-Que souhaitez-vous savoir exactement sur le calcul des scores?""",
-                
-                'general': """Je suis Sofiene, votre expert en Belote Tunisienne Contrée amélioré!
+**Configuration détaillée:**
+• Flexibilité maximale dans la composition
+• Main équilibrée recommandée
+• Quelques atouts appréciés mais non obligatoires
+• Liberté totale de choix
 
-**Mes spécialités:**
-🎯 Règles d'annonces complètes (90-140 points)
-🔍 Évaluation de main experte
-📊 Calcul de scores et stratégies
-👑 Belote/Rebelote et bonus
-🏆 Capot et situations spéciales
-🎲 Coinche/Surcoinche
+**Exemples de mains conformes:**
+• Composition libre avec bon équilibre
+• Mix d'atouts et de cartes fortes
+• Main sans critère strict
 
-Posez-moi une question précise et je vous donnerai une réponse experte!"""
-            },
-            'en': {
-                'announcement_rules': """I can explain complete announcement rules:
+**💡 Conseil Sofiene:**
+Annonce flexible parfaite pour s'adapter au jeu. Utilisez votre expérience pour juger.""",
+        
+        110: """**📢 Recommandation officielle pour 110 points**
 
-**Official recommendations:**
-• **90 points:** Minimum 2 Aces
-• **100 points:** "Generally as you wish"
-• **110 points:** Complete trumps mandatory
-• **120 points:** Max 3 colors + complete trumps
-• **130 points:** Max 2 colors + complete trumps
-• **140 points:** Opponent max 1 trick
+**CRITÈRE OBLIGATOIRE:** Atouts Complets
 
-Please specify your question for a more detailed answer!""",
-                
-                'hand_evaluation': """To evaluate your hand, describe your cards precisely:
-
-**Recommended format:**
-"I have Jack, 9, Ace of diamonds, plus 10 of hearts, King of clubs..."
-
-**I can analyze:**
-• Your announcement potential
-• Risks and opportunities
-• Optimal strategy
-• Possible alternatives
-
-Describe your hand and I'll give you expert analysis!""",
-                
-                'scoring': """Belote Contrée scoring follows precise rules:
-
-**Points per round:** 162 total (152 cards + 10 ten of last)
-**Belote/Rebelote:** +20 points
-**Capot:** 250 automatic points
-**Coinche:** ×2, Surcoinche: ×4
-
-What exactly would you like to know about score calculation?""",
-                
-                'general': """I'm Sofiene, your enhanced Tunisian Belote Contrée expert!
-
-**My specialties:**
-🎯 Complete announcement rules (90-140 points)
-🔍 Expert hand evaluation
-📊 Score calculation and strategies
-👑 Belote/Rebelote and bonuses
-🏆 Capot and special situations
-🎲 Coinche/Surcoinche
-
-Ask me a specific question and I'll give you an expert answer!"""
-            }
-        }
-        
-        return fallbacks.get(language, fallbacks['fr']).get(intent, fallbacks[language]['general'])
-    
-    def extract_intent_enhanced(self, query: str, language: str = 'fr') -> str:
-        """Extraction d'intention améliorée"""
-        query_lower = query.lower()
-        keywords = self.language_processor.extract_keywords(query, language)
-        
-        # Priorités d'intention
-        if any(word in keywords for word in ['belote', 'rebelote', 'roi', 'dame', 'king', 'queen']):
-            return 'belote_rebelote'
-        
-        if any(word in keywords for word in ['coinche', 'surcoinche', 'multiplicateur', 'multiplier']):
-            return 'coinche'
-        
-        if any(word in keywords for word in ['capot', 'tous', 'plis', 'all', 'tricks']):
-            return 'capot'
-        
-        if any(word in keywords for word in ['main', 'hand', 'évaluer', 'evaluate', 'analyser', 'analyze']):
-            return 'hand_evaluation'
-        
-        if any(word in keywords for word in ['annonce', 'announcement', 'recommandation', 'recommendation']):
-            return 'announcement_rules'
-        
-        if any(word in keywords for word in ['score', 'calcul', 'calculation', 'points']):
-            return 'scoring'
-        
-        return 'general'
-    
-    def handle_hand_evaluation_enhanced(self, query: str, language: str = 'fr') -> str:
-        """Évaluation de main améliorée"""
-        evaluation = self.hand_evaluator.evaluate_hand_advanced(query, language)
-        
-        if language == 'fr':
-            response = f"""**🎯 Analyse experte de votre main par Sofiene**
-
-**Recommandation officielle:** {evaluation.recommended_announcement} points
-**Niveau de confiance:** {evaluation.confidence:.0%}
-
-**Raisonnement:**
-{evaluation.reasoning}
-
-{evaluation.detailed_analysis}
-
-**Alternatives envisageables:** {', '.join(map(str, evaluation.alternative_options))} points
-
-**💡 Conseil d'expert Sofiene:**
-Vérifiez que votre main respecte strictement les critères officiels avant d'annoncer. En cas de doute, optez pour une annonce plus conservatrice."""
-        else:
-            response = f"""**🎯 Sofiene's expert hand analysis**
-
-**Official recommendation:** {evaluation.recommended_announcement} points
-**Confidence level:** {evaluation.confidence:.0%}
-
-**Reasoning:**
-{evaluation.reasoning}
-
-{evaluation.detailed_analysis}
-
-
-**Possible alternatives:** {', '.join(map(str, evaluation.alternative_options))} points
-
-**💡 Sofiene's expert advice:**
-Verify your hand strictly meets official criteria before announcing. When in doubt, choose a more conservative announcement."""
-        
-        return response
-    
-    def get_announcement_recommendation_enhanced(self, points: int, language: str = 'fr') -> str:
-        """Recommandations d'annonces améliorées avec exemples"""
-        recommendations = {
-            'fr': {
-                90: """**📢 Recommandation officielle pour 90 points**
-
-**Critère obligatoire:** 2 As minimum
-
-**Configuration détaillée:**
-• Main relativement faible mais jouable
-• Au moins 2 As dans votre jeu (n'importe quelle couleur)
-• Stratégie défensive acceptable
-• Risque modéré
-
-**Exemples de mains conformes:**
-• As♠ As♥ + 6 autres cartes diverses
-• As♦ As♣ + cartes moyennes
-• As♠ As♦ + quelques figures
-
-**💡 Conseil Sofiene:**
-Annonce sûre et recommandée pour débuter. Idéale quand vous n'êtes pas sûr de votre main.""",
-                
-                100: """**📢 Recommandation officielle pour 100 points**
-
-**Critère officiel:** "Généralement comme tu veux"
-
-**Configuration détaillée:**
-• Flexibilité maximale dans la composition
-• Main équilibrée recommandée
-• Quelques atouts appréciés mais non obligatoires
-• Liberté totale de choix
-
-**Exemples de mains conformes:**
-• Composition libre avec bon équilibre
-• Mix d'atouts et de cartes fortes
-• Main sans critère strict
-
-**💡 Conseil Sofiene:**
-Annonce flexible parfaite pour s'adapter au jeu. Utilisez votre expérience pour juger.""",
-                
-                110: """**📢 Recommandation officielle pour 110 points**
-
-**CRITÈRE OBLIGATOIRE:** Atouts Complets
-
-**Configuration strictement requise:**
-• Être sûr de collecter toutes les cartes d'atout dès le début
-• **Option 1:** (Valet, 9, As, 10) d'atout minimum
-• **Option 2:** (Valet, 9, As + 2+ autres cartes d'atout)
-• Confiance totale dans le contrôle des atouts
+**Configuration strictement requise:**
+• Être sûr de collecter toutes les cartes d'atout dès le début
+• **Option 1:** (Valet, 9, As, 10) d'atout minimum
+• **Option 2:** (Valet, 9, As + 2+ autres cartes d'atout)
+• Confiance totale dans le contrôle des atouts
 
 **Exemples de mains conformes:**
 • Valet♠ 9♠ As♠ 10♠ + 4 autres cartes
@@ -1412,8 +740,8 @@ Annonce flexible parfaite pour s'adapter au jeu. Utilisez votre expérience pour
 
 **💡 Conseil Sofiene:**
 Ne prenez ce risque que si vous êtes absolument certain de contrôler tous les atouts.""",
-                
-                120: """**📢 Recommandation officielle pour 120 points**
+        
+        120: """**📢 Recommandation officielle pour 120 points**
 
 **CRITÈRE OBLIGATOIRE:** Maximum 3 couleurs + Atouts Complets
 
@@ -1433,8 +761,8 @@ Ne prenez ce risque que si vous êtes absolument certain de contrôler tous les
 
 **💡 Conseil Sofiene:**
 Respectez STRICTEMENT la limite de 3 couleurs! Comptez bien avant d'annoncer.""",
-                
-                130: """**📢 Recommandation officielle pour 130 points**
+        
+        130: """**📢 Recommandation officielle pour 130 points**
 
 **CRITÈRE TRÈS STRICT:** Maximum 2 couleurs + Atouts Complets
 
@@ -1454,8 +782,8 @@ Respectez STRICTEMENT la limite de 3 couleurs! Comptez bien avant d'annoncer."""
 
 **💡 Conseil Sofiene:**
 Configuration très restrictive! Soyez absolument certain avant d'annoncer.""",
-                
-                140: """**📢 Recommandation officielle pour 140 points**
+        
+        140: """**📢 Recommandation officielle pour 140 points**
 
 **CRITÈRE EXTRÊME:** L'adversaire ne peut avoir qu'un seul pli maximum
 
@@ -1474,9 +802,9 @@ Configuration très restrictive! Soyez absolument certain avant d'annoncer.""",
 
 **💡 Conseil Sofiene:**
 Annonce exceptionnelle pour mains parfaites. N'annoncez que si vous êtes certain à 95%!"""
-            },
-            'en': {
-                90: """**📢 Official recommendation for 90 points**
+    },
+    'en': {
+        90: """**📢 Official recommendation for 90 points**
 
 **Mandatory criterion:** Minimum 2 Aces
 
@@ -1493,8 +821,8 @@ Annonce exceptionnelle pour mains parfaites. N'annoncez que si vous êtes certai
 
 **💡 Sofiene's advice:**
 Safe and recommended announcement for beginners. Ideal when unsure about your hand.""",
-                
-                100: """**📢 Official recommendation for 100 points**
+        
+        100: """**📢 Official recommendation for 100 points**
 
 **Official criterion:** "Generally as you wish"
 
@@ -1511,8 +839,8 @@ Safe and recommended announcement for beginners. Ideal when unsure about your ha
 
 **💡 Sofiene's advice:**
 Flexible announcement perfect for adapting to the game. Use your experience to judge.""",
-                
-                110: """**📢 Official recommendation for 110 points**
+        
+        110: """**📢 Official recommendation for 110 points**
 
 **MANDATORY CRITERION:** Complete Trumps
 
@@ -1531,8 +859,8 @@ Flexible announcement perfect for adapting to the game. Use your experience to j
 
 **💡 Sofiene's advice:**
 Only take this risk if absolutely certain of controlling all trumps.""",
-                
-                120: """**📢 Official recommendation for 120 points**
+        
+        120: """**📢 Official recommendation for 120 points**
 
 **MANDATORY CRITERION:** Maximum 3 colors + Complete Trumps
 
@@ -1552,8 +880,8 @@ Only take this risk if absolutely certain of controlling all trumps.""",
 
 **💡 Sofiene's advice:**
 STRICTLY respect the 3-color limit! Count carefully before announcing.""",
-                
-                130: """**📢 Official recommendation for 130 points**
+        
+        130: """**📢 Official recommendation for 130 points**
 
 **VERY STRICT CRITERION:** Maximum 2 colors + Complete Trumps
 
@@ -1573,8 +901,8 @@ STRICTLY respect the 3-color limit! Count carefully before announcing.""",
 
 **💡 Sofiene's advice:**
 Very restrictive configuration! Be absolutely certain before announcing.""",
-                
-                140: """**📢 Official recommendation for 140 points**
+        
+        140: """**📢 Official recommendation for 140 points**
 
 **EXTREME CRITERION:** Opponent can have maximum one trick
 
@@ -1593,18 +921,13 @@ Very restrictive configuration! Be absolutely certain before announcing.""",
 
 **💡 Sofiene's advice:**
 Exceptional announcement for perfect hands. Only announce if 95% certain!"""
-            }
-        }
-        
-        return recommendations.get(language, recommendations['fr']).get(points, 
-            f"Aucune recommandation pour {points} points." if language == 'fr' 
-            else f"No recommendation for {points} points.")
-    
-    def get_announcement_conditions_enhanced(self, points: int, language: str = 'fr') -> str:
-        """Conditions d'annonces améliorées"""
-        conditions = {
-            'fr': {
-                90: """**🎯 Quand annoncer 90 points:**
+    }
+}
+
+# Conditions d'annonces par langue et par nombre de points
+_ANNOUNCEMENT_CONDITIONS = {
+    'fr': {
+        90: """**🎯 Quand annoncer 90 points:**
 
 **Conditions idéales:**
 • Vous avez au moins 2 As (obligatoire)
@@ -1621,8 +944,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • Main très faible sans As
 • Aucun atout dans la couleur choisie
 • Adversaires très confiants""",
-                
-                100: """**🎯 Quand annoncer 100 points:**
+        
+        100: """**🎯 Quand annoncer 100 points:**
 
 **Conditions idéales:**
 • "Généralement comme tu veux" (règle officielle)
@@ -1638,8 +961,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 **À éviter:**
 • Main exceptionnelle (visez plus haut)
 • Main très faible (restez à 90)""",
-                
-                110: """**🎯 Quand annoncer 110 points:**
+        
+        110: """**🎯 Quand annoncer 110 points:**
 
 **Conditions OBLIGATOIRES:**
 • Atouts complets absolument certains
@@ -1655,8 +978,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • Doute sur vos atouts
 • Atouts incomplets
 • Adversaires semblent forts dans votre couleur""",
-                
-                120: """**🎯 Quand annoncer 120 points:**
+        
+        120: """**🎯 Quand annoncer 120 points:**
 
 **Conditions STRICTES:**
 • Maximum 3 couleurs à la main (compter!)
@@ -1672,8 +995,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • 4 couleurs dans votre main
 • Atouts incomplets
 • Doute sur le comptage des couleurs""",
-                
-                130: """**🎯 Quand annoncer 130 points:**
+        
+        130: """**🎯 Quand annoncer 130 points:**
 
 **Conditions TRÈS STRICTES:**
 • Maximum 2 couleurs à la main seulement
@@ -1689,8 +1012,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • Plus de 2 couleurs
 • Atouts incomplets
 • Moindre incertitude""",
-                
-                140: """**🎯 Quand annoncer 140 points:**
+        
+        140: """**🎯 Quand annoncer 140 points:**
 
 **Conditions EXTRÊMES:**
 • Main quasi-parfaite uniquement
@@ -1706,9 +1029,9 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • Moindre doute
 • Main "juste" très bonne
 • Manque d'expérience"""
-            },
-            'en': {
-                90: """**🎯 When to announce 90 points:**
+    },
+    'en': {
+        90: """**🎯 When to announce 90 points:**
 
 **Ideal conditions:**
 • You have at least 2 Aces (mandatory)
@@ -1725,8 +1048,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • Very weak hand without Aces
 • No trumps in chosen suit
 • Very confident opponents""",
-                
-                100: """**🎯 When to announce 100 points:**
+        
+        100: """**🎯 When to announce 100 points:**
 
 **Ideal conditions:**
 • "Generally as you wish" (official rule)
@@ -1742,8 +1065,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 **To avoid:**
 • Exceptional hand (aim higher)
 • Very weak hand (stay at 90)""",
-                
-                110: """**🎯 When to announce 110 points:**
+        
+        110: """**🎯 When to announce 110 points:**
 
 **MANDATORY conditions:**
 • Complete trumps absolutely certain
@@ -1759,8 +1082,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • Doubt about your trumps
 • Incomplete trumps
 • Opponents seem strong in your suit""",
-                
-                120: """**🎯 When to announce 120 points:**
+        
+        120: """**🎯 When to announce 120 points:**
 
 **STRICT conditions:**
 • Maximum 3 colors in hand (count!)
@@ -1776,8 +1099,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • 4 colors in your hand
 • Incomplete trumps
 • Doubt about color counting""",
-                
-                130: """**🎯 When to announce 130 points:**
+        
+        130: """**🎯 When to announce 130 points:**
 
 **VERY STRICT conditions:**
 • Maximum 2 colors in hand only
@@ -1793,8 +1116,8 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • More than 2 colors
 • Incomplete trumps
 • Slightest uncertainty""",
-                
-                140: """**🎯 When to announce 140 points:**
+        
+        140: """**🎯 When to announce 140 points:**
 
 **EXTREME conditions:**
 • Near-perfect hand only
@@ -1810,85 +1133,590 @@ Exceptional announcement for perfect hands. Only announce if 95% certain!"""
 • Slightest doubt
 • "Just" very good hand
 • Lack of experience"""
-            }
-        }
-        
-        return conditions.get(language, conditions['fr']).get(points, 
-            f"Conditions pour {points} points non définies." if language == 'fr' 
-            else f"Conditions for {points} points not defined.")
-    
-    def get_belote_detailed_info(self, language: str = 'fr') -> str:
-        """Informations détaillées Belote/Rebelote"""
-        rule = self.rules_db.get_all_rules()['belote_rebelote_detailed']
-        title = rule['title_fr'] if language == 'fr' else rule['title_en']
-        content = rule['content_fr'] if language == 'fr' else rule['content_en']
-        return f"**{title}**\n\n{content}"
-    
-    def get_coinche_detailed_info(self, language: str = 'fr') -> str:
-        """Informations détaillées Coinche/Surcoinche"""
-        rule = self.rules_db.get_all_rules()['coinche_system_detailed']
-        title = rule['title_fr'] if language == 'fr' else rule['title_en']
-        content = rule['content_fr'] if language == 'fr' else rule['content_en']
-        return f"**{title}**\n\n{content}"
-    
-    def get_capot_detailed_info(self, language: str = 'fr') -> str:
-        """Informations détaillées Capot"""
-        rule = self.rules_db.get_all_rules()['capot_rules_complete']
-        title = rule['title_fr'] if language == 'fr' else rule['title_en']
-        content = rule['content_fr'] if language == 'fr' else rule['content_en']
-        return f"**{title}**\n\n{content}"
-    
-    def generate_enhanced_response(self, matches: List[RuleMatch], query: str, language: str = 'fr') -> str:
-        """Générer une réponse améliorée"""
-        if not matches:
-            return self.intelligent_fallback(query, language)
-        
-        best_match = matches[0]
-        rule = best_match.rule_data
-        
-        title = rule['title_fr'] if language == 'fr' else rule['title_en']
-        content = rule['content_fr'] if language == 'fr' else rule['content_en']
-        
-        response = f"**{title}**\n\n{content}"
-        
-        # Ajouter informations sur la qualité de la correspondance
-        if best_match.score > 0.9:
-            confidence = "Excellente" if language == 'fr' else "Excellent"
-        elif best_match.score > 0.7:
-            confidence = "Bonne" if language == 'fr' else "Good"
-        else:
-            confidence = "Correcte" if language == 'fr' else "Correct"
+    }
+}
+
+# Réponses de repli par langue et par intention
+_FALLBACKS = {
+    'fr': {
+        'announcement_rules': """Je peux vous expliquer les règles d'annonces complètes:
+
+**Recommandations officielles:**
+• **90 points:** 2 As minimum
+• **100 points:** "Généralement comme tu veux"
+• **110 points:** Atouts complets obligatoires
+• **120 points:** Max 3 couleurs + atouts complets
+• **130 points:** Max 2 couleurs + atouts complets
+• **140 points:** Adversaire max 1 pli
+
+Précisez votre question pour une réponse plus détaillée!""",
         
-        # Ajouter conseils d'expert pour certaines catégories
-        if rule['category'] == 'announcements' and best_match.score > 0.8:
-            expert_tip = f"\n\n**💡 Conseil d'expert Sofiene:**\n• Respectez strictement les critères officiels\n• En cas de doute, optez pour une annonce plus conservatrice\n• Observez le jeu des adversaires pour ajuster votre stratégie" if language == 'fr' else f"\n\n**💡 Sofiene expert tip:**\n• Strictly follow official criteria\n• When in doubt, choose more conservative announcement\n• Observe opponents' game to adjust your strategy"
-            response += expert_tip
+        'hand_evaluation': """Pour évaluer votre main, décrivez-moi vos cartes précisément:
+
+**Format recommandé:**
+"J'ai Valet, 9, As de carreau, plus 10 de cœur, Roi de trèfle..."
+
+**Je peux analyser:**
+• Votre potentiel d'annonce
+• Les risques et opportunités
+• La stratégie optimale
+• Les alternatives possibles
+
+Décrivez votre main et je vous donnerai une analyse experte!""",
         
-        # Ajouter suggestions de règles connexes
-        if len(matches) > 1 and best_match.score > 0.8:
-            related_header = "**📚 Voir aussi:**" if language == 'fr' else "**📚 See also:**"
-            response += f"\n\n{related_header}\n"
-            for match in matches[1:3]:
-                related_title = match.rule_data['title_fr'] if language == 'fr' else match.rule_data['title_en']
-                response += f"• {related_title}\n"
+        'scoring': """Le système de score de la Belote Contrée suit des règles précises:
+
+**Points par manche:** 162 total (152 cartes + 10 dix de der)
+**Belote/Rebelote:** +20 points
+**Capot:** 250 points automatiques
+**Coinche:** ×2, Surcoinche: ×4
+
+Que souhaitez-vous savoir exactement sur le calcul des scores?""",
         
-        return response
-    
-    def _cache_response(self, cache_key: str, response: str):
-        """Mettre en cache une réponse"""
-        if len(self.query_cache) >= self.max_cache_size:
-            # Supprimer les entrées les plus anciennes
-            oldest_key = next(iter(self.query_cache))
-            del self.query_cache[oldest_key]
+        'general': """Je suis Sofiene, votre expert en Belote Tunisienne Contrée amélioré!
+
+**Mes spécialités:**
+🎯 Règles d'annonces complètes (90-140 points)
+🔍 Évaluation de main experte
+📊 Calcul de scores et stratégies
+👑 Belote/Rebelote et bonus
+🏆 Capot et situations spéciales
+🎲 Coinche/Surcoinche
+
+Posez-moi une question précise et je vous donnerai une réponse experte!"""
+    },
+    'en': {
+        'announcement_rules': """I can explain complete announcement rules:
+
+**Official recommendations:**
+• **90 points:** Minimum 2 Aces
+• **100 points:** "Generally as you wish"
+• **110 points:** Complete trumps mandatory
+• **120 points:** Max 3 colors + complete trumps
+• **130 points:** Max 2 colors + complete trumps
+• **140 points:** Opponent max 1 trick
+
+Please specify your question for a more detailed answer!""",
         
-        self.query_cache[cache_key] = response
+        'hand_evaluation': """To evaluate your hand, describe your cards precisely:
 
-class EnhancedConversationManager:
-    """Gestionnaire de conversation amélioré"""
-    
-    def __init__(self):
-        self.messages: List[Dict[str, Any]] = []
-        self.context_window = 7
+**Recommended format:**
+"I have Jack, 9, Ace of diamonds, plus 10 of hearts, King of clubs..."
+
+**I can analyze:**
+• Your announcement potential
+• Risks and opportunities
+• Optimal strategy
+• Possible alternatives
+
+Describe your hand and I'll give you expert analysis!""",
+        
+        'scoring': """Belote Contrée scoring follows precise rules:
+
+**Points per round:** 162 total (152 cards + 10 ten of last)
+**Belote/Rebelote:** +20 points
+**Capot:** 250 automatic points
+**Coinche:** ×2, Surcoinche: ×4
+
+What exactly would you like to know about score calculation?""",
+        
+        'general': """I'm Sofiene, your enhanced Tunisian Belote Contrée expert!
+
+**My specialties:**
+🎯 Complete announcement rules (90-140 points)
+🔍 Expert hand evaluation
+📊 Score calculation and strategies
+👑 Belote/Rebelote and bonuses
+🏆 Capot and special situations
+🎲 Coinche/Surcoinche
+
+Ask me a specific question and I'll give you an expert answer!"""
+    }
+}
+
+# Fragments localisés des réponses construites à partir des règles
+_RESPONSE_STRINGS = {
+    'fr': {
+        'expert_tip': "\n\n**💡 Conseil d'expert Sofiene:**\n• Respectez strictement les critères officiels\n• En cas de doute, optez pour une annonce plus conservatrice\n• Observez le jeu des adversaires pour ajuster votre stratégie",
+        'related_header': "**📚 Voir aussi:**"
+    },
+    'en': {
+        'expert_tip': "\n\n**💡 Sofiene expert tip:**\n• Strictly follow official criteria\n• When in doubt, choose more conservative announcement\n• Observe opponents' game to adjust your strategy",
+        'related_header': "**📚 See also:**"
+    }
+}
+
+class EnhancedSofieneAI:
+    """Sofiene AI amélioré avec compréhension linguistique avancée"""
+    
+    def __init__(self):
+        # Modèle et embeddings chargés au premier besoin: les requêtes résolues par motifs
+        # ou mots-clés ne paient jamais l'import de PyTorch
+        self._model = None
+        self._model_loaded = False
+        self._rule_embeddings = None
+        self.rules_db = ComprehensiveRulesDatabase()
+        self.hand_evaluator = EnhancedHandEvaluator()
+        self.language_processor = LanguageProcessor()
+        self.fuzzy_matcher = FuzzyMatcher()
+        self._variation_index = self._build_variation_index()
+        self._variation_boost_index = self._build_variation_boost_index()
+        self.context_window = 5
+        self.keyword_min_specificity = 2.0
+        
+        # Cache LRU des réponses par (requête, langue), pour améliorer les performances
+        self.query_cache = OrderedDict()
+        self.max_cache_size = 512
+        
+        # Cache LRU des embeddings de requêtes (clé: empreinte blake2b du texte)
+        self.embedding_cache = OrderedDict()
+        self.max_embedding_cache_size = 512
+        
+        # L'instance est partagée entre sessions (get_sofiene_ai): protéger les caches
+        self._cache_lock = threading.Lock()
+    
+    @property
+    def model(self):
+        """Encodeur de phrases (chargé à la première utilisation)"""
+        if not self._model_loaded:
+            self._model = load_sentence_transformer()
+            self._model_loaded = True
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+        self._model_loaded = True
+    
+    @property
+    def rule_embeddings(self) -> Dict[str, Any]:
+        """Embeddings des règles (calculés ou chargés à la première utilisation)"""
+        if self._rule_embeddings is None:
+            # Passage par le setter: copie float32 faite une seule fois, le cache disque reste en float16
+            self.rule_embeddings = self.initialize_embeddings() if self.model else {}
+        return self._rule_embeddings
+    
+    @rule_embeddings.setter
+    def rule_embeddings(self, embeddings: Dict[str, Any]):
+        # Matrices float32 contiguës: le score de toutes les règles reste un seul appel BLAS
+        self._rule_embeddings = {
+            key: np.ascontiguousarray(value, dtype=np.float32) if isinstance(value, np.ndarray) else value
+            for key, value in embeddings.items()
+        }
+    
+    def initialize_embeddings(self):
+        """Initialiser les embeddings (partagés entre sessions pour une même base de règles)"""
+        return load_rule_embeddings(self.rules_db.rules_hash, self)
+    
+    def compute_embeddings(self):
+        """Calculer les embeddings pour toutes les règles"""
+        if not self.model:
+            return {}
+            
+        try:
+            with st.spinner("Initialisation de l'expertise Sofiene améliorée..."):
+                rules = self.rules_db.get_all_rules()
+                texts_fr = []
+                texts_en = []
+                
+                for rule in rules.values():
+                    # Texte français enrichi
+                    text_fr = f"{rule['title_fr']} {rule['content_fr']} {' '.join(rule['keywords_fr'])}"
+                    if 'query_variations_fr' in rule:
+                        text_fr += f" {' '.join(rule['query_variations_fr'])}"
+                    texts_fr.append(text_fr)
+                    
+                    # Texte anglais enrichi
+                    text_en = f"{rule['title_en']} {rule['content_en']} {' '.join(rule['keywords_en'])}"
+                    if 'query_variations_en' in rule:
+                        text_en += f" {' '.join(rule['query_variations_en'])}"
+                    texts_en.append(text_en)
+                
+                # Un seul encodage par lots pour les deux langues, vecteurs normalisés,
+                # puis découpage en une matrice (N, D) float16 par langue
+                matrix = self._encode_batch(texts_fr + texts_en)
+                embeddings = {
+                    'rule_ids': list(rules),
+                    'fr': np.ascontiguousarray(matrix[:len(texts_fr)]),
+                    'en': np.ascontiguousarray(matrix[len(texts_fr):])
+                }
+                    
+            return embeddings
+        except Exception as e:
+            st.error(f"Erreur de traitement: {str(e)}")
+            return {}
+    
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encoder une liste de textes en une matrice float16 contiguë aux lignes normalisées"""
+        import torch
+        
+        # Pas de suivi autograd: encodage seul, jamais de rétropropagation
+        with torch.inference_mode():
+            matrix = self.model.encode(
+                texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+            )
+        # float16 suffit pour un classement par cosinus (erreur ~1e-3) et divise la taille par deux
+        return np.ascontiguousarray(matrix, dtype=np.float16)
+    
+    def process_query_enhanced(self, query: str, language: str = 'fr', context: List[str] = None) -> str:
+        """Traitement de requête amélioré avec cache et fallbacks multiples"""
+        
+        # Vérifier le cache (toutes les étapes travaillent sur la requête en minuscules et sans espaces de bord)
+        cache_key = (query.lower().strip(), language)
+        with self._cache_lock:
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                # Marquer comme récemment utilisé
+                self.query_cache.move_to_end(cache_key)
+                return cached
+        
+        # Normaliser la requête
+        normalized_query = self.language_processor.normalize_query(query, language)
+        
+        # Essayer différentes approches dans l'ordre
+        response = None
+        
+        # 1. Patterns spécifiques améliorés
+        response = self.handle_enhanced_patterns(query, language)
+        if response:
+            self._cache_response(cache_key, response)
+            return response
+        
+        # Mots-clés extraits une seule fois, partagés par l'index inversé et la recherche sémantique
+        query_keywords = self.language_processor.extract_keywords(normalized_query, language)
+        
+        # 2. Index inversé des mots-clés (évite la recherche sémantique si la requête est sans ambiguïté)
+        response = self.keyword_search(normalized_query, language, query_keywords)
+        if response:
+            self._cache_response(cache_key, response)
+            return response
+        
+        # 3. Recherche sémantique
+        if self.model and self.rule_embeddings:
+            response = self.semantic_search_enhanced(normalized_query, language, query_keywords)
+            if response:
+                self._cache_response(cache_key, response)
+                return response
+        
+        # 4. Matching flou
+        response = self.fuzzy_search(normalized_query, language)
+        if response:
+            self._cache_response(cache_key, response)
+            return response
+        
+        # 5. Fallback intelligent
+        response = self.intelligent_fallback(query, language, context)
+        self._cache_response(cache_key, response)
+        return response
+    
+    def handle_enhanced_patterns(self, query: str, language: str = 'fr') -> Optional[str]:
+        """Gestion améliorée des patterns spécifiques"""
+        route = _route_query(query.lower().strip(), language)
+        if route is None:
+            return None
+        
+        handler, args = route
+        # L'évaluation de main analyse le texte original de la requête
+        if handler == 'handle_hand_evaluation_enhanced':
+            return self.handle_hand_evaluation_enhanced(query, language)
+        return getattr(self, handler)(*args, language)
+    
+    def keyword_search(self, query: str, language: str = 'fr', query_keywords: Optional[Set[str]] = None) -> Optional[str]:
+        """Recherche par index inversé des mots-clés"""
+        if query_keywords is None:
+            query_keywords = self.language_processor.extract_keywords(query, language)
+        scores = self.rules_db.score_rules_by_keywords(query_keywords, language)
+        if not scores:
+            return None
+        
+        # Seules les trois meilleures règles sont utilisées: sélection partielle plutôt que tri complet
+        ranked = heapq.nlargest(3, scores.items(), key=itemgetter(1))
+        
+        best_id, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        
+        # Exiger des mots-clés spécifiques et une nette avance sur la deuxième règle
+        if best_score < self.keyword_min_specificity or best_score < 2 * runner_up:
+            return None
+        
+        total = sum(scores.values())
+        rules = self.rules_db.get_all_rules()
+        matches = [
+            RuleMatch(rule_id=rule_id, score=score / total, rule_data=rules[rule_id], match_type="exact")
+            for rule_id, score in ranked
+        ]
+        return self.generate_enhanced_response(matches, query, language)
+    
+    def semantic_search_enhanced(self, query: str, language: str = 'fr', query_keywords: Optional[Set[str]] = None) -> Optional[str]:
+        """Recherche sémantique améliorée"""
+        try:
+            query_embedding = self._encode_query(query)
+            
+            # Extraire les mots-clés de la requête (sauf s'ils sont fournis par l'appelant)
+            if query_keywords is None:
+                query_keywords = self.language_processor.extract_keywords(query, language)
+            
+            # Similarité cosinus avec toutes les règles en un seul produit matrice-vecteur
+            # (lignes de la matrice et requête déjà normalisées)
+            rule_matrix = self.rule_embeddings[language]
+            similarities = (rule_matrix @ query_embedding).astype(np.float64)
+            rules = self.rules_db.get_all_rules()
+            rule_ids = self.rule_embeddings['rule_ids']
+            if not rule_ids:
+                return None
+            
+            # Boosts mots-clés (un produit sur la matrice d'incidence, boost maximal de 0.4) et variations
+            keyword_boosts = np.minimum(self.rules_db.keyword_coverage(query_keywords, language) * 0.4, 0.4)
+            variation_boosts = self.calculate_variation_boosts(query, language)
+            scores = similarities + keyword_boosts + variation_boosts
+            
+            # Top 3 par sélection partielle, puis tri des seuls candidats retenus
+            top_k = min(3, len(scores))
+            top_idx = np.argpartition(-scores, top_k - 1)[:top_k]
+            top_idx = top_idx[np.lexsort((top_idx, -scores[top_idx]))]
+            
+            top_matches = [
+                RuleMatch(rule_id=rule_ids[i], score=float(scores[i]), rule_data=rules[rule_ids[i]], match_type="semantic")
+                for i in top_idx
+            ]
+            
+            if top_matches and top_matches[0].score > 0.3:
+                return self.generate_enhanced_response(top_matches, query, language)
+                
+        except Exception as e:
+            st.warning(f"Erreur de recherche sémantique: {str(e)}")
+        
+        return None
+    
+    def fuzzy_search(self, query: str, language: str = 'fr') -> Optional[str]:
+        """Recherche floue comme fallback"""
+        try:
+            # Variations précalculées (et déjà prétraitées) pour la langue demandée
+            variation_texts, variation_rules = self._variation_index.get(language, ((), ()))
+            
+            # Seule la meilleure correspondance floue est utilisée
+            fuzzy_matches = self.fuzzy_matcher.find_best_matches(query, variation_texts, top_k=1, preprocessed=True)
+            
+            if fuzzy_matches and fuzzy_matches[0][1] > 0.7:
+                # Retrouver la règle correspondante via l'index du candidat
+                _, score, index = fuzzy_matches[0]
+                rule_id, rule = variation_rules[index]
+                match = RuleMatch(
+                    rule_id=rule_id,
+                    score=score,
+                    rule_data=rule,
+                    match_type="fuzzy"
+                )
+                return self.generate_enhanced_response([match], query, language)
+            
+        except Exception as e:
+            st.warning(f"Erreur de recherche floue: {str(e)}")
+        
+        return None
+    
+    def _build_variation_index(self) -> Dict[str, Tuple[Tuple[str, ...], Tuple[Tuple[str, Dict], ...]]]:
+        """Construire, par langue, la liste des variations de requête (prétraitées une fois) et leurs règles"""
+        index = {}
+        for language in ('fr', 'en'):
+            texts = []
+            rules = []
+            for rule_id, rule in self.rules_db.get_all_rules().items():
+                for variation in rule.get(f'query_variations_{language}', []):
+                    texts.append(self.fuzzy_matcher.preprocess(variation))
+                    rules.append((rule_id, rule))
+            index[language] = (tuple(texts), tuple(rules))
+        return index
+    
+    def _build_variation_boost_index(self) -> Dict[str, Tuple[Tuple[str, ...], np.ndarray, np.ndarray]]:
+        """Construire, par langue, les variations en minuscules à plat avec le début et la taille du segment de chaque règle"""
+        index = {}
+        for language in ('fr', 'en'):
+            texts = []
+            starts = []
+            counts = []
+            for rule in self.rules_db.get_all_rules().values():
+                variations = rule.get(f'query_variations_{language}', [])
+                starts.append(len(texts))
+                counts.append(len(variations))
+                texts.extend(variation.lower() for variation in variations)
+            index[language] = (tuple(texts), np.array(starts, dtype=np.intp), np.array(counts, dtype=np.intp))
+        return index
+    
+    def calculate_variation_boosts(self, query: str, language: str = 'fr') -> np.ndarray:
+        """Boost de variation de toutes les règles (ordre des règles), en un seul appel RapidFuzz si disponible"""
+        texts, starts, counts = self._variation_boost_index[language]
+        best = np.zeros(len(counts))
+        if not texts:
+            return best
+        
+        # Similarité de la requête (mise en minuscules une seule fois) avec toutes les variations déjà en minuscules
+        query_lower = query.lower()
+        if DEPENDENCIES_AVAILABLE:
+            scores = process.cdist([query_lower], texts, scorer=fuzz.ratio, processor=None, dtype=np.float64)[0] / 100.0
+        else:
+            scores = np.fromiter(
+                (SequenceMatcher(None, query_lower, text).ratio() for text in texts),
+                dtype=np.float64, count=len(texts)
+            )
+        
+        # Maximum par segment de règle
+        has_variations = counts > 0
+        best[has_variations] = np.maximum.reduceat(scores, starts[has_variations])
+        
+        # Seuil de similarité
+        return np.where(best > 0.7, best * 0.3, 0.0)
+    
+    def intelligent_fallback(self, query: str, language: str = 'fr', context: List[str] = None) -> str:
+        """Fallback intelligent basé sur l'intention"""
+        intent = self.extract_intent_enhanced(query, language)
+        # Pas de valeurs par défaut évaluées d'avance (langue inconnue -> KeyError auparavant)
+        fallbacks = _FALLBACKS.get(language) or _FALLBACKS['fr']
+        return fallbacks.get(intent) or fallbacks['general']
+    
+    def extract_intent_enhanced(self, query: str, language: str = 'fr') -> str:
+        """Extraction d'intention améliorée"""
+        keywords = self.language_processor.extract_keywords(query, language)
+        
+        # Un seul passage sur les mots-clés: l'intention de plus haute priorité trouvée l'emporte
+        ranks = [_INTENT_BY_WORD[word] for word in keywords if word in _INTENT_BY_WORD]
+        return _INTENT_PRIORITY[min(ranks)][0] if ranks else 'general'
+    
+    def handle_hand_evaluation_enhanced(self, query: str, language: str = 'fr') -> str:
+        """Évaluation de main améliorée"""
+        evaluation = self.hand_evaluator.evaluate_hand_advanced(query, language)
+        
+        if language == 'fr':
+            response = f"""**🎯 Analyse experte de votre main par Sofiene**
+
+**Recommandation officielle:** {evaluation.recommended_announcement} points
+**Niveau de confiance:** {evaluation.confidence:.0%}
+
+**Raisonnement:**
+{evaluation.reasoning}
+
+{evaluation.detailed_analysis}
+
+**Alternatives envisageables:** {', '.join(map(str, evaluation.alternative_options))} points
+
+**💡 Conseil d'expert Sofiene:**
+Vérifiez que votre main respecte strictement les critères officiels avant d'annoncer. En cas de doute, optez pour une annonce plus conservatrice."""
+        else:
+            response = f"""**🎯 Sofiene's expert hand analysis**
+
+**Official recommendation:** {evaluation.recommended_announcement} points
+**Confidence level:** {evaluation.confidence:.0%}
+
+**Reasoning:**
+{evaluation.reasoning}
+
+{evaluation.detailed_analysis}
+
+
+**Possible alternatives:** {', '.join(map(str, evaluation.alternative_options))} points
+
+**💡 Sofiene's expert advice:**
+Verify your hand strictly meets official criteria before announcing. When in doubt, choose a more conservative announcement."""
+        
+        return response
+    
+    def get_announcement_recommendation_enhanced(self, points: int, language: str = 'fr') -> str:
+        """Recommandations d'annonces améliorées avec exemples"""
+        # Texte statique: le message par défaut n'est formaté que si les points sont inconnus
+        recommendation = _ANNOUNCEMENT_RECOMMENDATIONS.get(language, _ANNOUNCEMENT_RECOMMENDATIONS['fr']).get(points)
+        if recommendation is not None:
+            return recommendation
+        return (f"Aucune recommandation pour {points} points." if language == 'fr' 
+                else f"No recommendation for {points} points.")
+    
+    def get_announcement_conditions_enhanced(self, points: int, language: str = 'fr') -> str:
+        """Conditions d'annonces améliorées"""
+        conditions = _ANNOUNCEMENT_CONDITIONS.get(language, _ANNOUNCEMENT_CONDITIONS['fr']).get(points)
+        if conditions is not None:
+            return conditions
+        return (f"Conditions pour {points} points non définies." if language == 'fr' 
+                else f"Conditions for {points} points not defined.")
+    
+    def get_belote_detailed_info(self, language: str = 'fr') -> str:
+        """Informations détaillées Belote/Rebelote"""
+        return self._format_rule(self.rules_db.get_all_rules()['belote_rebelote_detailed'], language)
+    
+    def get_coinche_detailed_info(self, language: str = 'fr') -> str:
+        """Informations détaillées Coinche/Surcoinche"""
+        return self._format_rule(self.rules_db.get_all_rules()['coinche_system_detailed'], language)
+    
+    def get_capot_detailed_info(self, language: str = 'fr') -> str:
+        """Informations détaillées Capot"""
+        return self._format_rule(self.rules_db.get_all_rules()['capot_rules_complete'], language)
+    
+    def generate_enhanced_response(self, matches: List[RuleMatch], query: str, language: str = 'fr') -> str:
+        """Générer une réponse améliorée"""
+        if not matches:
+            return self.intelligent_fallback(query, language)
+        
+        best_match = matches[0]
+        score = best_match.score
+        rule = best_match.rule_data
+        lang = 'fr' if language == 'fr' else 'en'
+        strings = _RESPONSE_STRINGS[lang]
+        
+        parts = [self._format_rule(rule, lang)]
+        
+        # Ajouter conseils d'expert pour certaines catégories
+        if rule['category'] == 'announcements' and score > 0.8:
+            parts.append(strings['expert_tip'])
+        
+        # Ajouter suggestions de règles connexes
+        if score > 0.8 and len(matches) > 1:
+            parts.append(f"\n\n{strings['related_header']}\n")
+            title_key = f'title_{lang}'
+            parts.extend(f"• {match.rule_data[title_key]}\n" for match in islice(matches, 1, 3))
+        
+        return "".join(parts)
+    
+    @staticmethod
+    def _format_rule(rule: Dict, language: str) -> str:
+        """Titre et contenu d'une règle dans la langue demandée (anglais par défaut hors français)"""
+        lang = 'fr' if language == 'fr' else 'en'
+        return f"**{rule[f'title_{lang}']}**\n\n{rule[f'content_{lang}']}"
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Encoder une requête (vecteur float32 normalisé) en réutilisant l'embedding déjà calculé"""
+        cache_key = hashlib.blake2b(query.encode('utf-8'), digest_size=16).hexdigest()
+        with self._cache_lock:
+            embedding = self.embedding_cache.get(cache_key)
+            if embedding is not None:
+                # Marquer comme récemment utilisé
+                self.embedding_cache.move_to_end(cache_key)
+                return embedding
+        
+        embedding = np.asarray(self.model.encode(query, show_progress_bar=False), dtype=np.float32)
+        # Normaliser une seule fois: le cosinus devient un simple produit scalaire
+        norm = np.linalg.norm(embedding)
+        if norm:
+            embedding = embedding / norm
+        with self._cache_lock:
+            if cache_key not in self.embedding_cache and len(self.embedding_cache) >= self.max_embedding_cache_size:
+                # Supprimer l'entrée la moins récemment utilisée
+                self.embedding_cache.popitem(last=False)
+            self.embedding_cache[cache_key] = embedding
+        return embedding
+    
+    def _cache_response(self, cache_key: Tuple[str, str], response: str):
+        """Mettre en cache une réponse"""
+        with self._cache_lock:
+            if cache_key not in self.query_cache and len(self.query_cache) >= self.max_cache_size:
+                # Supprimer l'entrée la moins récemment utilisée
+                self.query_cache.popitem(last=False)
+            
+            self.query_cache[cache_key] = response
+
+class EnhancedConversationManager:
+    """Gestionnaire de conversation amélioré"""
+    
+    def __init__(self):
+        self.context_window = 7
+        # Historique borné: les plus anciens messages sont retirés en O(1)
+        self.messages: Deque[Dict[str, Any]] = deque(maxlen=self.context_window * 2)
         self.conversation_stats = {
             'total_queries': 0,
             'successful_responses': 0,
@@ -1901,7 +1729,8 @@ class EnhancedConversationManager:
         message = {
             'sender': sender,
             'content': content,
-            'timestamp': datetime.now().isoformat(),
+            # Heure brute: formatée seulement à l'export
+            'timestamp': datetime.now(),
             'metadata': metadata or {}
         }
         self.messages.append(message)
@@ -1911,21 +1740,18 @@ class EnhancedConversationManager:
             self.conversation_stats['total_queries'] += 1
         elif sender == 'bot':
             self.conversation_stats['successful_responses'] += 1
-        
-        # Limiter la taille de l'historique
-        if len(self.messages) > self.context_window * 2:
-            self.messages = self.messages[-self.context_window * 2:]
     
     def get_enhanced_context(self) -> Dict[str, Any]:
         """Obtenir un contexte enrichi"""
-        recent_messages = self.messages[-self.context_window:]
-        user_messages = [msg['content'] for msg in recent_messages if msg['sender'] == 'user']
-        
-        # Analyser les sujets abordés
+        # Un seul passage sur la fenêtre récente: requêtes utilisateur et sujets abordés
+        user_messages = []
         topics = set()
-        for msg in recent_messages:
-            if 'category' in msg.get('metadata', {}):
-                topics.add(msg['metadata']['category'])
+        for msg in islice(self.messages, max(0, len(self.messages) - self.context_window), None):
+            if msg['sender'] == 'user':
+                user_messages.append(msg['content'])
+            metadata = msg.get('metadata', {})
+            if 'category' in metadata:
+                topics.add(metadata['category'])
         
         return {
             'recent_queries': user_messages,
@@ -1934,33 +1760,40 @@ class EnhancedConversationManager:
             'session_stats': self.conversation_stats
         }
     
+    def export_enhanced_conversation_text(self, language: str = 'fr') -> str:
+        """Texte d'export amélioré de la conversation"""
+        stats = self.conversation_stats
+        # En-tête amélioré
+        header = "=== Conversation Sofiene Expert Belote Contrée ===" if language == 'fr' else "=== Sofiene Belote Contrée Expert Conversation ==="
+        parts = [
+            f"{header}\n",
+            f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Durée: {datetime.now() - stats['start_time']}\n",
+            f"Requêtes totales: {stats['total_queries']}\n",
+            f"Réponses fournies: {stats['successful_responses']}\n",
+            f"Sujets abordés: {', '.join(stats['categories_discussed'])}\n\n",
+        ]
+        
+        # Messages avec métadonnées
+        for msg in self.messages:
+            timestamp = msg['timestamp'].strftime('%H:%M:%S')
+            sender_label = "Vous" if msg['sender'] == 'user' and language == 'fr' else \
+                          "You" if msg['sender'] == 'user' else \
+                          "Sofiene Expert"
+            
+            parts.append(f"[{timestamp}] {sender_label}:\n{msg['content']}\n\n")
+        
+        # Statistiques finales
+        success_rate = (stats['successful_responses'] / max(1, stats['total_queries'])) * 100
+        parts.append(f"\n--- Statistiques de session ---\n")
+        parts.append(f"Taux de réussite: {success_rate:.1f}%" if language == 'fr' else f"Success rate: {success_rate:.1f}%")
+        return "".join(parts)
+    
     def export_enhanced_conversation(self, filename: str, language: str = 'fr'):
         """Export amélioré de la conversation"""
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                # En-tête amélioré
-                header = "=== Conversation Sofiene Expert Belote Contrée ===" if language == 'fr' else "=== Sofiene Belote Contrée Expert Conversation ==="
-                f.write(f"{header}\n")
-                f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Durée: {datetime.now() - self.conversation_stats['start_time']}\n")
-                f.write(f"Requêtes totales: {self.conversation_stats['total_queries']}\n")
-                f.write(f"Réponses fournies: {self.conversation_stats['successful_responses']}\n")
-                f.write(f"Sujets abordés: {', '.join(self.conversation_stats['categories_discussed'])}\n\n")
-                
-                # Messages avec métadonnées
-                for msg in self.messages:
-                    timestamp = datetime.fromisoformat(msg['timestamp']).strftime('%H:%M:%S')
-                    sender_label = "Vous" if msg['sender'] == 'user' and language == 'fr' else \
-                                  "You" if msg['sender'] == 'user' else \
-                                  "Sofiene Expert"
-                    
-                    f.write(f"[{timestamp}] {sender_label}:\n{msg['content']}\n\n")
-                
-                # Statistiques finales
-                success_rate = (self.conversation_stats['successful_responses'] / max(1, self.conversation_stats['total_queries'])) * 100
-                f.write(f"\n--- Statistiques de session ---\n")
-                f.write(f"Taux de réussite: {success_rate:.1f}%" if language == 'fr' else f"Success rate: {success_rate:.1f}%")
-                
+                f.write(self.export_enhanced_conversation_text(language))
             return True
         except Exception as e:
             st.error(f"Erreur d'export: {str(e)}")
@@ -1971,9 +1804,7 @@ def init_enhanced_session_state():
     if 'conversation' not in st.session_state:
         st.session_state.conversation = EnhancedConversationManager()
     if 'ai' not in st.session_state:
-        st.session_state.ai = EnhancedSofieneAI()
-        if st.session_state.ai.model:
-            st.session_state.ai.rule_embeddings = st.session_state.ai.initialize_embeddings()
+        st.session_state.ai = get_sofiene_ai()
     if 'language' not in st.session_state:
         st.session_state.language = 'fr'
     if 'messages' not in st.session_state:
@@ -1985,91 +1816,356 @@ def init_enhanced_session_state():
             'detailed_analysis': True
         }
 
-def get_enhanced_suggestions(language: str):
-    """Suggestions améliorées avec catégorisation"""
-    if language == 'fr':
-        return {
-            "🎯 Annonces": [
-                "Recommandation pour 120 points avec exemples",
-                "Quand annoncer 110 points exactement?",
-                "Différence entre 120 et 130 points",
-                "Règles strictes pour 140 points"
-            ],
-            "👑 Belote/Rebelote": [
-                "Stratégies avancées belote rebelote",
-                "Quand utiliser roi dame atout?",
-                "Timing optimal pour belote rebelote"
-            ],
-            "🏆 Techniques": [
-                "Règles complètes du capot",
-                "Système coinche surcoinche détaillé",
-                "Calcul avancé des scores"
-            ],
-            "🔍 Évaluation": [
-                "J'ai Valet, 9, As et 10 carreau plus 4 autres cartes",
-                "Analyser ma main: As cœur, As trèfle, Roi pique",
-                "Évaluation experte de main complexe"
-            ]
-        }
-    else:
-        return {
-            "🎯 Announcements": [
-                "Recommendation for 120 points with examples",
-                "When to announce 110 points exactly?",
-                "Difference between 120 and 130 points",
-                "Strict rules for 140 points"
-            ],
-            "👑 Belote/Rebelote": [
-                "Advanced belote rebelote strategies",
-                "When to use king queen trump?",
-                "Optimal timing for belote rebelote"
-            ],
-            "🏆 Techniques": [
-                "Complete capot rules",
-                "Detailed coinche surcoinche system",
-                "Advanced score calculation"
-            ],
-            "🔍 Evaluation": [
-                "I have Jack, 9, Ace and 10 diamonds plus 4 other cards",
-                "Analyze my hand: Ace hearts, Ace clubs, King spades",
-                "Expert evaluation of complex hand"
-            ]
-        }
+# Suggestions catégorisées par langue (constantes: la barre latérale est redessinée à chaque rerun)
+_SUGGESTIONS = {
+    'fr': {
+        "🎯 Annonces": (
+            "Recommandation pour 120 points avec exemples",
+            "Quand annoncer 110 points exactement?",
+            "Différence entre 120 et 130 points",
+            "Règles strictes pour 140 points"
+        ),
+        "👑 Belote/Rebelote": (
+            "Stratégies avancées belote rebelote",
+            "Quand utiliser roi dame atout?",
+            "Timing optimal pour belote rebelote"
+        ),
+        "🏆 Techniques": (
+            "Règles complètes du capot",
+            "Système coinche surcoinche détaillé",
+            "Calcul avancé des scores"
+        ),
+        "🔍 Évaluation": (
+            "J'ai Valet, 9, As et 10 carreau plus 4 autres cartes",
+            "Analyser ma main: As cœur, As trèfle, Roi pique",
+            "Évaluation experte de main complexe"
+        )
+    },
+    'en': {
+        "🎯 Announcements": (
+            "Recommendation for 120 points with examples",
+            "When to announce 110 points exactly?",
+            "Difference between 120 and 130 points",
+            "Strict rules for 140 points"
+        ),
+        "👑 Belote/Rebelote": (
+            "Advanced belote rebelote strategies",
+            "When to use king queen trump?",
+            "Optimal timing for belote rebelote"
+        ),
+        "🏆 Techniques": (
+            "Complete capot rules",
+            "Detailed coinche surcoinche system",
+            "Advanced score calculation"
+        ),
+        "🔍 Evaluation": (
+            "I have Jack, 9, Ace and 10 diamonds plus 4 other cards",
+            "Analyze my hand: Ace hearts, Ace clubs, King spades",
+            "Expert evaluation of complex hand"
+        )
+    }
+}
+
+def get_enhanced_suggestions(language: str):
+    """Suggestions améliorées avec catégorisation"""
+    return _SUGGESTIONS['fr'] if language == 'fr' else _SUGGESTIONS['en']
+
+def process_enhanced_message(message: str):
+    """Traiter un message avec l'IA améliorée"""
+    st.session_state.messages.append({"role": "user", "content": message})
+    
+    # Ajouter métadonnées (l'horodatage est posé par add_message)
+    metadata = {
+        'query_length': len(message)
+    }
+    st.session_state.conversation.add_message("user", message, metadata)
+    
+    # Obtenir le contexte enrichi
+    context = st.session_state.conversation.get_enhanced_context()
+    
+    # Traiter avec l'IA améliorée
+    response = st.session_state.ai.process_query_enhanced(
+        message, 
+        st.session_state.language, 
+        context['recent_queries']
+    )
+    
+    # Déterminer la catégorie pour les métadonnées
+    intent = st.session_state.ai.extract_intent_enhanced(message, st.session_state.language)
+    response_metadata = {
+        'category': intent,
+        'confidence': 'high',  # Pourrait être calculé
+        'response_length': len(response)
+    }
+    
+    st.session_state.conversation.add_message("bot", response, response_metadata)
+    st.session_state.messages.append({"role": "assistant", "content": response})
+    
+    # Mettre à jour les statistiques
+    st.session_state.conversation.conversation_stats['categories_discussed'].add(intent)
+
+# Blocs HTML/CSS statiques de la page (construits une seule fois, réutilisés à chaque rerun)
+_CSS_BLOCK = """
+<style>
+.stButton > button {
+    width: 100%;
+    margin-bottom: 5px;
+    border-radius: 20px;
+    border: 2px solid #1f4e79;
+    transition: all 0.3s ease;
+}
+.stButton > button:hover {
+    background-color: #1f4e79;
+    color: white;
+    transform: translateY(-2px);
+}
+.sofiene-header {
+    background: linear-gradient(135deg, #1f4e79, #2d5aa0, #3a6bb3);
+    color: white;
+    padding: 1.5rem;
+    border-radius: 15px;
+    text-align: center;
+    margin-bottom: 1rem;
+    box-shadow: 0 4px 15px rgba(0,0,0,0.2);
+}
+.expert-badge {
+    background: linear-gradient(45deg, #28a745, #20c997);
+    color: white;
+    padding: 0.3rem 0.8rem;
+    border-radius: 20px;
+    font-size: 0.8rem;
+    margin-left: 0.5rem;
+    box-shadow: 0 2px 10px rgba(40,167,69,0.3);
+}
+.suggestion-category {
+    background-color: #f8f9fa;
+    padding: 1rem;
+    border-radius: 10px;
+    margin-bottom: 0.5rem;
+    border-left: 4px solid #1f4e79;
+}
+.stats-card {
+    background: linear-gradient(135deg, #e3f2fd, #bbdefb);
+    padding: 1rem;
+    border-radius: 10px;
+    margin: 0.5rem 0;
+    text-align: center;
+}
+.footer-dev {
+    background: linear-gradient(135deg, #f0f2f6, #e1e5e9);
+    padding: 1rem;
+    border-radius: 10px;
+    font-size: 0.8rem;
+    text-align: center;
+    margin-top: 1rem;
+    color: #666;
+}
+</style>
+"""
+
+_SIDEBAR_HEADER_HTML = """
+<div class="sofiene-header">
+    <h1>🎮 Sofiene Expert</h1>
+    <p>Expert en Belote Tunisienne Contrée</p>
+    <span class="expert-badge">IA Avancée</span>
+</div>
+"""
+
+_FOOTER_DEV_HTML = """
+<div class="footer-dev">
+    <p><strong>🚀 Sofiene Expert v2.0</strong></p>
+    <p>Développé par <strong>BellaajMohsen7</strong></p>
+    <p>IA Avancée • Compréhension Linguistique • Expertise Complète</p>
+</div>
+"""
+
+# Textes localisés de l'interface (la langue est résolue une seule fois par rendu)
+_STRINGS = {
+    'fr': {
+        'lang_fr_button': "🇫🇷 Français",
+        'lang_en_button': "🇬🇧 EN",
+        'preferences_header': "⚙️ Préférences",
+        'expert_mode': "Mode expert",
+        'detailed_analysis': "Analyses détaillées",
+        'suggestions_header': "💡 Suggestions par catégorie:",
+        'stats_header': "📊 Statistiques de session",
+        'export_button': "💾 Exporter conversation",
+        'export_success': "✅ Exporté: {filename}",
+        'download_button': "📥 Télécharger",
+        'title': "🎮 Sofiene Expert - Belote Tunisienne Contrée",
+        'intro': """
+        **🧠 Assistant IA avancé pour maîtriser la Belote Contrée**
+        
+        Sofiene Expert utilise une intelligence artificielle avancée avec compréhension linguistique améliorée 
+        pour vous accompagner dans tous les aspects de la Belote Tunisienne Contrée.
+        
+        **🎯 Nouvelles capacités:**
+        • Compréhension de variations linguistiques ("règle d'annonce", "que annoncer", etc.)
+        • Analyse experte de main avec recommandations détaillées
+        • Base de données complète des règles officielles
+        • Réponses contextuelles et adaptatives
+        • Gestion des fautes de frappe et langage informel
+        
+        **🔥 Expertise disponible:**
+        • Recommandations officielles pour tous les niveaux d'annonce (90-140)
+        • Évaluation experte de vos mains avec analyse détaillée
+        • Règles complètes Belote/Rebelote avec stratégies
+        • Système de scoring officiel avec cas spéciaux
+        • Coinche/Surcoinche et gestion des risques
+        • Règles du Capot et situations exceptionnelles
+        """,
+        'demo_header': "🚀 Testez les nouvelles capacités de Sofiene Expert",
+        'demo_columns': ("""
+                **🎯 Compréhension linguistique:**
+                • "règle d'annonce" ou "regle annonce"
+                • "que annoncer avec ma main?"
+                • "calculer point" ou "calcul score"
+                • "quand utiliser belote rebelote"
+                """, """
+                **🔍 Évaluation avancée:**
+                • "J'ai Valet, 9, As carreau, que annoncer?"
+                • "Main avec 6 atouts dont Valet et 9"
+                • "As cœur, As trèfle, Roi pique, conseil?"
+                • "Analyser ma main complexe"
+                """),
+        'chat_placeholder': "Posez votre question sur la Belote Contrée... (Sofiene comprend maintenant les variations!)",
+        'spinner': "🧠 Sofiene Expert analyse...",
+        'analysis_error': "🚨 Erreur d'analyse: {error}",
+        'error_fallback': """🔧 Je rencontre une difficulté technique temporaire. 
+
+**Essayez:**
+• Reformuler votre question différemment
+• Utiliser des termes plus simples
+• Poser une question plus spécifique
+
+**Exemples qui fonctionnent:**
+• "Recommandation pour 120 points"
+• "Règles belote rebelote"
+• "Calculer les scores"
+
+Je suis là pour vous aider!""",
+        'footer_columns': ("""
+            **🎯 IA Avancée**
+            • Compréhension linguistique
+            • Gestion des variations
+            • Apprentissage contextuel
+            """, """
+            **📚 Base Complète**
+            • Toutes les règles officielles
+            • Cas spéciaux et exceptions
+            • Exemples pratiques
+            """, """
+            **🔍 Analyse Experte**
+            • Évaluation de main détaillée
+            • Recommandations précises
+            • Stratégies optimales
+            """, """
+            **💡 Assistant Intelligent**
+            • Réponses adaptatives
+            • Suggestions contextuelles
+            • Support multilingue
+            """),
+        'footer_credits': """
+        ---
+        **🚀 Sofiene Expert v2.0 - Développé avec passion par BellaajMohsen7**  
+        *Intelligence Artificielle Avancée pour la Belote Tunisienne Contrée*
+        
+        📧 Contact: BellaajMohsen7@github.com | 🌟 Version 2.0 Production | 🧠 IA Enhanced
+        """
+    },
+    'en': {
+        'lang_fr_button': "🇫🇷 FR",
+        'lang_en_button': "🇬🇧 English",
+        'preferences_header': "⚙️ Preferences",
+        'expert_mode': "Expert mode",
+        'detailed_analysis': "Detailed analysis",
+        'suggestions_header': "💡 Suggestions by category:",
+        'stats_header': "📊 Session statistics",
+        'export_button': "💾 Export conversation",
+        'export_success': "✅ Exported: {filename}",
+        'download_button': "📥 Download",
+        'title': "🎮 Sofiene Expert - Tunisian Belote Contrée",
+        'intro': """
+        **🧠 Advanced AI assistant to master Belote Contrée**
+        
+        Sofiene Expert uses advanced artificial intelligence with enhanced linguistic understanding 
+        to accompany you in all aspects of Tunisian Belote Contrée.
+        
+        **🎯 New capabilities:**
+        • Understanding of linguistic variations ("announcement rule", "what to announce", etc.)
+        • Expert hand analysis with detailed recommendations
+        • Complete database of official rules
+        • Contextual and adaptive responses
+        • Handling of typos and informal language
+        
+        **🔥 Available expertise:**
+        • Official recommendations for all announcement levels (90-140)
+        • Expert evaluation of your hands with detailed analysis
+        • Complete Belote/Rebelote rules with strategies
+        • Official scoring system with special cases
+        • Coinche/Surcoinche and risk management
+        • Capot rules and exceptional situations
+        """,
+        'demo_header': "🚀 Test Sofiene Expert's new capabilities",
+        'demo_columns': ("""
+                **🎯 Linguistic understanding:**
+                • "announcement rule" or "announce rule"
+                • "what to announce with my hand?"
+                • "calculate point" or "score calculation"
+                • "when to use belote rebelote"
+                """, """
+                **🔍 Advanced evaluation:**
+                • "I have Jack, 9, Ace diamonds, what to announce?"
+                • "Hand with 6 trumps including Jack and 9"
+                • "Ace hearts, Ace clubs, King spades, advice?"
+                • "Analyze my complex hand"
+                """),
+        'chat_placeholder': "Ask your Belote Contrée question... (Sofiene now understands variations!)",
+        'spinner': "🧠 Sofiene Expert analyzing...",
+        'analysis_error': "🚨 Analysis error: {error}",
+        'error_fallback': """🔧 I'm experiencing a temporary technical difficulty.
+
+**Try:**
+• Rephrase your question differently
+• Use simpler terms
+• Ask a more specific question
 
-def process_enhanced_message(message: str):
-    """Traiter un message avec l'IA améliorée"""
-    st.session_state.messages.append({"role": "user", "content": message})
-    
-    # Ajouter métadonnées
-    metadata = {
-        'query_length': len(message),
-        'timestamp': datetime.now().isoformat()
-    }
-    st.session_state.conversation.add_message("user", message, metadata)
-    
-    # Obtenir le contexte enrichi
-    context = st.session_state.conversation.get_enhanced_context()
-    
-    # Traiter avec l'IA améliorée
-    response = st.session_state.ai.process_query_enhanced(
-        message, 
-        st.session_state.language, 
-        context['recent_queries']
-    )
-    
-    # Déterminer la catégorie pour les métadonnées
-    intent = st.session_state.ai.extract_intent_enhanced(message, st.session_state.language)
-    response_metadata = {
-        'category': intent,
-        'confidence': 'high',  # Pourrait être calculé
-        'response_length': len(response)
+**Examples that work:**
+• "Recommendation for 120 points"
+• "Belote rebelote rules"
+• "Calculate scores"
+
+I'm here to help!""",
+        'footer_columns': ("""
+            **🎯 Advanced AI**
+            • Linguistic understanding
+            • Variation handling
+            • Contextual learning
+            """, """
+            **📚 Complete Base**
+            • All official rules
+            • Special cases and exceptions
+            • Practical examples
+            """, """
+            **🔍 Expert Analysis**
+            • Detailed hand evaluation
+            • Precise recommendations
+            • Optimal strategies
+            """, """
+            **💡 Intelligent Assistant**
+            • Adaptive responses
+            • Contextual suggestions
+            • Multilingual support
+            """),
+        'footer_credits': """
+        ---
+        **🚀 Sofiene Expert v2.0 - Developed with passion by BellaajMohsen7**  
+        *Advanced Artificial Intelligence for Tunisian Belote Contrée*
+        
+        📧 Contact: BellaajMohsen7@github.com | 🌟 Version 2.0 Production | 🧠 AI Enhanced
+        """
     }
-    
-    st.session_state.conversation.add_message("bot", response, response_metadata)
-    st.session_state.messages.append({"role": "assistant", "content": response})
-    
-    # Mettre à jour les statistiques
-    st.session_state.conversation.conversation_stats['categories_discussed'].add(intent)
+}
 
 def main_enhanced():
     """Application Streamlit principale améliorée"""
@@ -2083,104 +2179,38 @@ def main_enhanced():
     
     init_enhanced_session_state()
     
+    # Textes de la langue courante (un changement de langue relance le rendu)
+    ui = _STRINGS['fr'] if st.session_state.language == 'fr' else _STRINGS['en']
+    
     # CSS amélioré
-    st.markdown("""
-    <style>
-    .stButton > button {
-        width: 100%;
-        margin-bottom: 5px;
-        border-radius: 20px;
-        border: 2px solid #1f4e79;
-        transition: all 0.3s ease;
-    }
-    .stButton > button:hover {
-        background-color: #1f4e79;
-        color: white;
-        transform: translateY(-2px);
-    }
-    .sofiene-header {
-        background: linear-gradient(135deg, #1f4e79, #2d5aa0, #3a6bb3);
-        color: white;
-        padding: 1.5rem;
-        border-radius: 15px;
-        text-align: center;
-        margin-bottom: 1rem;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-    }
-    .expert-badge {
-        background: linear-gradient(45deg, #28a745, #20c997);
-        color: white;
-        padding: 0.3rem 0.8rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        margin-left: 0.5rem;
-        box-shadow: 0 2px 10px rgba(40,167,69,0.3);
-    }
-    .suggestion-category {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 10px;
-        margin-bottom: 0.5rem;
-        border-left: 4px solid #1f4e79;
-    }
-    .stats-card {
-        background: linear-gradient(135deg, #e3f2fd, #bbdefb);
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-        text-align: center;
-    }
-    .footer-dev {
-        background: linear-gradient(135deg, #f0f2f6, #e1e5e9);
-        padding: 1rem;
-        border-radius: 10px;
-        font-size: 0.8rem;
-        text-align: center;
-        margin-top: 1rem;
-        color: #666;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
     
     # Sidebar améliorée
     with st.sidebar:
-        st.markdown("""
-        <div class="sofiene-header">
-            <h1>🎮 Sofiene Expert</h1>
-            <p>Expert en Belote Tunisienne Contrée</p>
-            <span class="expert-badge">IA Avancée</span>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_SIDEBAR_HEADER_HTML, unsafe_allow_html=True)
         
         # Sélecteur de langue amélioré
-        current_lang = st.session_state.language
         col1, col2 = st.columns(2)
         with col1:
-            if st.button(f"🇫🇷 {'FR' if current_lang == 'en' else 'Français'}", key="lang_fr"):
+            if st.button(ui['lang_fr_button'], key="lang_fr"):
                 st.session_state.language = 'fr'
                 st.rerun()
         with col2:
-            if st.button(f"🇬🇧 {'EN' if current_lang == 'fr' else 'English'}", key="lang_en"):
+            if st.button(ui['lang_en_button'], key="lang_en"):
                 st.session_state.language = 'en'
                 st.rerun()
         
         st.divider()
         
         # Préférences utilisateur
-        if st.session_state.language == 'fr':
-            st.subheader("⚙️ Préférences")
-            st.session_state.user_preferences['expert_mode'] = st.checkbox("Mode expert", value=st.session_state.user_preferences['expert_mode'])
-            st.session_state.user_preferences['detailed_analysis'] = st.checkbox("Analyses détaillées", value=st.session_state.user_preferences['detailed_analysis'])
-        else:
-            st.subheader("⚙️ Preferences")
-            st.session_state.user_preferences['expert_mode'] = st.checkbox("Expert mode", value=st.session_state.user_preferences['expert_mode'])
-            st.session_state.user_preferences['detailed_analysis'] = st.checkbox("Detailed analysis", value=st.session_state.user_preferences['detailed_analysis'])
+        st.subheader(ui['preferences_header'])
+        st.session_state.user_preferences['expert_mode'] = st.checkbox(ui['expert_mode'], value=st.session_state.user_preferences['expert_mode'])
+        st.session_state.user_preferences['detailed_analysis'] = st.checkbox(ui['detailed_analysis'], value=st.session_state.user_preferences['detailed_analysis'])
         
         st.divider()
         
         # Suggestions catégorisées
-        suggestions_title = "💡 Suggestions par catégorie:" if st.session_state.language == 'fr' else "💡 Suggestions by category:"
-        st.subheader(suggestions_title)
+        st.subheader(ui['suggestions_header'])
         
         suggestions = get_enhanced_suggestions(st.session_state.language)
         for category, items in suggestions.items():
@@ -2193,10 +2223,7 @@ def main_enhanced():
         st.divider()
         
         # Statistiques de session
-        if st.session_state.language == 'fr':
-            st.subheader("📊 Statistiques de session")
-        else:
-            st.subheader("📊 Session statistics")
+        st.subheader(ui['stats_header'])
         
         stats = st.session_state.conversation.conversation_stats
         
@@ -2209,123 +2236,29 @@ def main_enhanced():
         """, unsafe_allow_html=True)
         
         # Export amélioré
-        if st.button("💾 " + ("Exporter conversation" if st.session_state.language == 'fr' else "Export conversation")):
+        if st.button(ui['export_button']):
             filename = f"sofiene_expert_conversation_{st.session_state.conversation.conversation_stats['start_time'].strftime('%Y%m%d_%H%M%S')}.txt"
-            if st.session_state.conversation.export_enhanced_conversation(filename, st.session_state.language):
-                st.success(f"✅ Exporté: {filename}" if st.session_state.language == 'fr' else f"✅ Exported: {filename}")
-                
-                try:
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        st.download_button(
-                            label="📥 " + ("Télécharger" if st.session_state.language == 'fr' else "Download"),
-                            data=f.read(),
-                            file_name=filename,
-                            mime="text/plain"
-                        )
-                except Exception as e:
-                    st.warning(f"⚠️ Erreur de téléchargement: {str(e)}" if st.session_state.language == 'fr' 
-                              else f"⚠️ Download error: {str(e)}")
+            export_text = st.session_state.conversation.export_enhanced_conversation_text(st.session_state.language)
+            st.success(ui['export_success'].format(filename=filename))
+            st.download_button(
+                label=ui['download_button'],
+                data=export_text,
+                file_name=filename,
+                mime="text/plain"
+            )
         
         # Footer développeur amélioré
-        st.markdown("""
-        <div class="footer-dev">
-            <p><strong>🚀 Sofiene Expert v2.0</strong></p>
-            <p>Développé par <strong>BellaajMohsen7</strong></p>
-            <p>IA Avancée • Compréhension Linguistique • Expertise Complète</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_FOOTER_DEV_HTML, unsafe_allow_html=True)
     
     # Contenu principal amélioré
-    if st.session_state.language == 'fr':
-        st.title("🎮 Sofiene Expert - Belote Tunisienne Contrée")
-        st.markdown("""
-        **🧠 Assistant IA avancé pour maîtriser la Belote Contrée**
-        
-        Sofiene Expert utilise une intelligence artificielle avancée avec compréhension linguistique améliorée 
-        pour vous accompagner dans tous les aspects de la Belote Tunisienne Contrée.
-        
-        **🎯 Nouvelles capacités:**
-        • Compréhension de variations linguistiques ("règle d'annonce", "que annoncer", etc.)
-        • Analyse experte de main avec recommandations détaillées
-        • Base de données complète des règles officielles
-        • Réponses contextuelles et adaptatives
-        • Gestion des fautes de frappe et langage informel
-        
-        **🔥 Expertise disponible:**
-        • Recommandations officielles pour tous les niveaux d'annonce (90-140)
-        • Évaluation experte de vos mains avec analyse détaillée
-        • Règles complètes Belote/Rebelote avec stratégies
-        • Système de scoring officiel avec cas spéciaux
-        • Coinche/Surcoinche et gestion des risques
-        • Règles du Capot et situations exceptionnelles
-        """)
-    else:
-        st.title("🎮 Sofiene Expert - Tunisian Belote Contrée")
-        st.markdown("""
-        **🧠 Advanced AI assistant to master Belote Contrée**
-        
-        Sofiene Expert uses advanced artificial intelligence with enhanced linguistic understanding 
-        to accompany you in all aspects of Tunisian Belote Contrée.
-        
-        **🎯 New capabilities:**
-        • Understanding of linguistic variations ("announcement rule", "what to announce", etc.)
-        • Expert hand analysis with detailed recommendations
-        • Complete database of official rules
-        • Contextual and adaptive responses
-        • Handling of typos and informal language
-        
-        **🔥 Available expertise:**
-        • Official recommendations for all announcement levels (90-140)
-        • Expert evaluation of your hands with detailed analysis
-        • Complete Belote/Rebelote rules with strategies
-        • Official scoring system with special cases
-        • Coinche/Surcoinche and risk management
-        • Capot rules and exceptional situations
-        """)
+    st.title(ui['title'])
+    st.markdown(ui['intro'])
     
     # Section de démonstration améliorée
-    if st.session_state.language == 'fr':
-        with st.expander("🚀 Testez les nouvelles capacités de Sofiene Expert"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("""
-                **🎯 Compréhension linguistique:**
-                • "règle d'annonce" ou "regle annonce"
-                • "que annoncer avec ma main?"
-                • "calculer point" ou "calcul score"
-                • "quand utiliser belote rebelote"
-                """)
-            
-            with col2:
-                st.markdown("""
-                **🔍 Évaluation avancée:**
-                • "J'ai Valet, 9, As carreau, que annoncer?"
-                • "Main avec 6 atouts dont Valet et 9"
-                • "As cœur, As trèfle, Roi pique, conseil?"
-                • "Analyser ma main complexe"
-                """)
-    else:
-        with st.expander("🚀 Test Sofiene Expert's new capabilities"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("""
-                **🎯 Linguistic understanding:**
-                • "announcement rule" or "announce rule"
-                • "what to announce with my hand?"
-                • "calculate point" or "score calculation"
-                • "when to use belote rebelote"
-                """)
-            
-            with col2:
-                st.markdown("""
-                **🔍 Advanced evaluation:**
-                • "I have Jack, 9, Ace diamonds, what to announce?"
-                • "Hand with 6 trumps including Jack and 9"
-                • "Ace hearts, Ace clubs, King spades, advice?"
-                • "Analyze my complex hand"
-                """)
+    with st.expander(ui['demo_header']):
+        for column, text in zip(st.columns(2), ui['demo_columns']):
+            with column:
+                st.markdown(text)
     
     # Interface de chat
     chat_container = st.container()
@@ -2336,17 +2269,12 @@ def main_enhanced():
                 st.markdown(message["content"])
     
     # Zone de saisie améliorée
-    if st.session_state.language == 'fr':
-        prompt_text = "Posez votre question sur la Belote Contrée... (Sofiene comprend maintenant les variations!)"
-    else:
-        prompt_text = "Ask your Belote Contrée question... (Sofiene now understands variations!)"
-    
-    if prompt := st.chat_input(prompt_text):
+    if prompt := st.chat_input(ui['chat_placeholder']):
         with st.chat_message("user"):
             st.markdown(prompt)
         
         with st.chat_message("assistant"):
-            with st.spinner("🧠 Sofiene Expert analyse..." if st.session_state.language == 'fr' else "🧠 Sofiene Expert analyzing..."):
+            with st.spinner(ui['spinner']):
                 try:
                     process_enhanced_message(prompt)
                     if st.session_state.messages and st.session_state.messages[-1]["role"] == "assistant":
@@ -2354,134 +2282,119 @@ def main_enhanced():
                         st.rerun()
                         
                 except Exception as e:
-                    error_msg = f"🚨 Erreur d'analyse: {str(e)}" if st.session_state.language == 'fr' else f"🚨 Analysis error: {str(e)}"
-                    st.error(error_msg)
+                    st.error(ui['analysis_error'].format(error=str(e)))
                     
                     # Message de fallback amélioré
-                    fallback_msg = """🔧 Je rencontre une difficulté technique temporaire. 
-
-**Essayez:**
-• Reformuler votre question différemment
-• Utiliser des termes plus simples
-• Poser une question plus spécifique
-
-**Exemples qui fonctionnent:**
-• "Recommandation pour 120 points"
-• "Règles belote rebelote"
-• "Calculer les scores"
-
-Je suis là pour vous aider!""" if st.session_state.language == 'fr' else """🔧 I'm experiencing a temporary technical difficulty.
-
-**Try:**
-• Rephrase your question differently
-• Use simpler terms
-• Ask a more specific question
-
-**Examples that work:**
-• "Recommendation for 120 points"
-• "Belote rebelote rules"
-• "Calculate scores"
-
-I'm here to help!"""
-                    st.markdown(fallback_msg)
+                    st.markdown(ui['error_fallback'])
     
     # Footer principal amélioré
     st.divider()
     
-    if st.session_state.language == 'fr':
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown("""
-            **🎯 IA Avancée**
-            • Compréhension linguistique
-            • Gestion des variations
-            • Apprentissage contextuel
-            """)
-        
-        with col2:
-            st.markdown("""
-            **📚 Base Complète**
-            • Toutes les règles officielles
-            • Cas spéciaux et exceptions
-            • Exemples pratiques
-            """)
-        
-        with col3:
-            st.markdown("""
-            **🔍 Analyse Experte**
-            • Évaluation de main détaillée
-            • Recommandations précises
-            • Stratégies optimales
-            """)
-        
-        with col4:
-            st.markdown("""
-            **💡 Assistant Intelligent**
-            • Réponses adaptatives
-            • Suggestions contextuelles
-            • Support multilingue
-            """)
-        
-        st.markdown("""
-        ---
-        **🚀 Sofiene Expert v2.0 - Développé avec passion par BellaajMohsen7**  
-        *Intelligence Artificielle Avancée pour la Belote Tunisienne Contrée*
-        
-        📧 Contact: BellaajMohsen7@github.com | 🌟 Version 2.0 Production | 🧠 IA Enhanced
-        """)
-    else:
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown("""
-            **🎯 Advanced AI**
-            • Linguistic understanding
-            • Variation handling
-            • Contextual learning
-            """)
-        
-        with col2:
-            st.markdown("""
-            **📚 Complete Base**
-            • All official rules
-            • Special cases and exceptions
-            • Practical examples
-            """)
-        
-        with col3:
-            st.markdown("""
-            **🔍 Expert Analysis**
-            • Detailed hand evaluation
-            • Precise recommendations
-            • Optimal strategies
-            """)
-        
-        with col4:
-            st.markdown("""
-            **💡 Intelligent Assistant**
-            • Adaptive responses
-            • Contextual suggestions
-            • Multilingual support
-            """)
-        
-        st.markdown("""
-        ---
-        **🚀 Sofiene Expert v2.0 - Developed with passion by BellaajMohsen7**  
-        *Advanced Artificial Intelligence for Tunisian Belote Contrée*
-        
-        📧 Contact: BellaajMohsen7@github.com | 🌟 Version 2.0 Production | 🧠 AI Enhanced
-        """)
+    for column, text in zip(st.columns(4), ui['footer_columns']):
+        with column:
+            st.markdown(text)
+    
+    st.markdown(ui['footer_credits'])
 
 @st.cache_resource
 def load_sentence_transformer():
     if DEPENDENCIES_AVAILABLE:
         try:
-            return SentenceTransformer('all-MiniLM-L6-v2')
+            # Import différé: le coût d'import de PyTorch n'est payé qu'ici
+            import torch
+            from sentence_transformers import SentenceTransformer
+            cache_folder = os.environ.get('ST_CACHE', '.st_cache')
+            
+            # Sur CPU, modèle ONNX quantifié int8 (GEMM int8 VNNI) plutôt que PyTorch fp32
+            if ONNX_AVAILABLE and not torch.cuda.is_available():
+                try:
+                    return SentenceTransformer(
+                        MODEL_NAME,
+                        cache_folder=cache_folder,
+                        backend='onnx',
+                        model_kwargs={'file_name': ONNX_MODEL_FILE}
+                    )
+                except Exception as e:
+                    # Export absent ou onnxruntime/optimum incompatibles: repli visible sur PyTorch
+                    logging.getLogger(__name__).warning(
+                        "Modèle ONNX %s indisponible, repli sur PyTorch: %s", ONNX_MODEL_FILE, e
+                    )
+            
+            # Dossier de cache persistant (évite de retélécharger le modèle à chaque démarrage) et GPU si disponible
+            if torch.cuda.is_available():
+                # Poids fp16 sur GPU (Tensor Cores): la dérive du cosinus (~1e-3) reste loin du seuil de 0.3
+                return SentenceTransformer(MODEL_NAME, cache_folder=cache_folder, device='cuda').half()
+            return SentenceTransformer(MODEL_NAME, cache_folder=cache_folder, device='cpu')
         except Exception as e:
             st.error(f"Error loading model: {str(e)}")
             return None
     return None
 
+@st.cache_resource
+def get_sofiene_ai() -> 'EnhancedSofieneAI':
+    """Instance unique de Sofiene par processus (modèle, index et caches partagés entre sessions)"""
+    return EnhancedSofieneAI()
+
+def _model_cache_tag(model) -> str:
+    """Backend et précision du modèle (ex. torch-fp16, torch-fp32, onnx-model_qint8_avx512_vnni) pour nommer le cache d'embeddings"""
+    backend = getattr(model, 'backend', 'torch')
+    # Modèles PyTorch: fp16 sur GPU, fp32 sur CPU; ONNX n'a pas de paramètres PyTorch (dtype None)
+    dtype = getattr(model, 'dtype', None)
+    if dtype is None:
+        # ONNX: la précision dépend de l'export choisi (ST_ONNX_FILE), chaque fichier a ses propres embeddings
+        if backend == 'onnx':
+            return f"onnx-{os.path.splitext(os.path.basename(ONNX_MODEL_FILE))[0]}"
+        return backend
+    precision = {'torch.float16': 'fp16', 'torch.float32': 'fp32', 'torch.bfloat16': 'bf16'}.get(str(dtype), str(dtype))
+    return f"{backend}-{precision}"
+
+@st.cache_resource
+def load_rule_embeddings(rules_hash: str, _ai: 'EnhancedSofieneAI') -> Dict[str, Any]:
+    """Charger ou calculer les embeddings des règles, une fois par version de la base"""
+    # Un jeu de fichiers par modèle, backend/précision et contenu des règles: toute modification invalide le cache
+    cache_base = os.path.join(EMBEDDINGS_CACHE_DIR, f"sofiene_{MODEL_NAME}_{_model_cache_tag(_ai.model)}_{rules_hash}")
+    
+    # Matrices float16 en .npy (lecture directe, sans décompression), identifiants en JSON
+    try:
+        with open(f"{cache_base}.json", encoding='utf-8') as f:
+            rule_ids = json.load(f)['rule_ids']
+        return {
+            'rule_ids': rule_ids,
+            'fr': np.load(f"{cache_base}.fr.npy"),
+            'en': np.load(f"{cache_base}.en.npy")
+        }
+    except Exception:
+        pass
+    
+    embeddings = _ai.compute_embeddings()
+    if not embeddings:
+        return embeddings
+    
+    # Stockage float16 (sans perte: l'encodage produit déjà du float16); l'instance en fait une copie
+    # float32 au premier accès, numpy n'ayant pas de produit matriciel BLAS en float16
+    embeddings = {
+        'rule_ids': embeddings['rule_ids'],
+        'fr': np.ascontiguousarray(embeddings['fr'], dtype=np.float16),
+        'en': np.ascontiguousarray(embeddings['en'], dtype=np.float16)
+    }
+    
+    # Sauvegarder les embeddings (le JSON en dernier: il valide la présence des matrices)
+    try:
+        os.makedirs(EMBEDDINGS_CACHE_DIR, exist_ok=True)
+        np.save(f"{cache_base}.fr.npy", embeddings['fr'])
+        np.save(f"{cache_base}.en.npy", embeddings['en'])
+        with open(f"{cache_base}.json", 'w', encoding='utf-8') as f:
+            json.dump({'rule_ids': embeddings['rule_ids']}, f)
+    except Exception:
+        pass
+    
+    return embeddings
+
+@st.cache_resource
+def load_rules():
+    """Charger les règles depuis belote_rules.json (une seule fois par processus)"""
+    with open(RULES_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
 if __name__ == "__main__":
     main_enhanced()
\ No newline at end of file
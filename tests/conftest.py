@@ -0,0 +1,42 @@
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# L'application est un module unique à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit_belote_app as app  # noqa: E402
+
+
+class FakeEncoder:
+    """Encodeur déterministe (somme de vecteurs aléatoires par mot) à la place du SentenceTransformer"""
+
+    dimension = 384
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        single = isinstance(texts, str)
+        vectors = np.stack([self._encode_one(text, normalize_embeddings) for text in ([texts] if single else texts)])
+        return vectors[0] if single else vectors
+
+    def _encode_one(self, text, normalize):
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in text.lower().split():
+            seed = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=4).digest(), 'little')
+            vector += np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if normalize and norm else vector
+
+
+@pytest.fixture
+def fake_encoder():
+    return FakeEncoder()
+
+
+@pytest.fixture
+def ai(monkeypatch):
+    """Sofiene sans modèle de phrases: motifs et mots-clés seulement"""
+    monkeypatch.setattr(app, 'load_sentence_transformer', lambda: None)
+    return app.EnhancedSofieneAI()
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import streamlit_belote_app as app
+
+_QUERIES = [("partenaire ajout points", 'fr'), ("calcul des scores", 'fr'), ("complete capot rules", 'en')]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Cache d'embeddings dans un dossier temporaire, vidé du cache mémoire de Streamlit"""
+    pytest.importorskip('torch')
+    monkeypatch.chdir(tmp_path)
+    app.load_rule_embeddings.clear()
+    yield tmp_path / app.EMBEDDINGS_CACHE_DIR
+    app.load_rule_embeddings.clear()
+
+
+def _sofiene(monkeypatch, encoder):
+    monkeypatch.setattr(app, 'load_sentence_transformer', lambda: encoder)
+    return app.EnhancedSofieneAI()
+
+
+def test_embeddings_cache_round_trip(cache_dir, monkeypatch, fake_encoder):
+    computed = _sofiene(monkeypatch, fake_encoder)
+    embeddings = computed.rule_embeddings
+    rules_hash = computed.rules_db.rules_hash
+    names = sorted(path.name for path in cache_dir.iterdir())
+    assert all(name.startswith(f"sofiene_{app.MODEL_NAME}_") for name in names)
+    assert sorted(name.split(rules_hash, 1)[1] for name in names) == ['.en.npy', '.fr.npy', '.json']
+
+    # Nouveau processus simulé: le cache mémoire est vidé, les matrices sont relues depuis le disque
+    app.load_rule_embeddings.clear()
+    reloaded = _sofiene(monkeypatch, fake_encoder)
+    reloaded.compute_embeddings = lambda: pytest.fail("les embeddings auraient dû être relus depuis le disque")
+    assert reloaded.rule_embeddings['rule_ids'] == embeddings['rule_ids'] == list(reloaded.rules_db.get_all_rules())
+    for language in ('fr', 'en'):
+        np.testing.assert_array_equal(reloaded.rule_embeddings[language], embeddings[language])
+
+    for query, language in _QUERIES:
+        query_embedding = computed._encode_query(query)
+        np.testing.assert_array_equal(
+            reloaded.rule_embeddings[language] @ query_embedding, embeddings[language] @ query_embedding
+        )
+        response = computed.semantic_search_enhanced(query, language)
+        assert response is not None
+        assert reloaded.semantic_search_enhanced(query, language) == response
+
+
+def test_embeddings_cache_is_float16_on_disk(cache_dir, monkeypatch, fake_encoder):
+    sofiene = _sofiene(monkeypatch, fake_encoder)
+    embeddings = sofiene.rule_embeddings
+    for language in ('fr', 'en'):
+        (path,) = cache_dir.glob(f"*.{language}.npy")
+        on_disk = np.load(path)
+        assert on_disk.dtype == np.float16
+        # Stockage sans perte: l'encodage arrondit déjà les vecteurs des règles en float16
+        np.testing.assert_array_equal(on_disk, embeddings[language])
+
+
+@pytest.mark.parametrize('model,file_name,tag', [
+    (SimpleNamespace(backend='onnx', dtype=None), 'onnx/model_qint8_avx512_vnni.onnx', 'onnx-model_qint8_avx512_vnni'),
+    (SimpleNamespace(backend='onnx', dtype=None), 'onnx/model_O4.onnx', 'onnx-model_O4'),
+    (SimpleNamespace(backend='torch', dtype='torch.float16'), 'onnx/model_O4.onnx', 'torch-fp16'),
+])
+def test_model_cache_tag(monkeypatch, model, file_name, tag):
+    monkeypatch.setattr(app, 'ONNX_MODEL_FILE', file_name)
+    assert app._model_cache_tag(model) == tag
@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.mark.parametrize('language,query,rule_id', [
+    ('fr', "regle annonce", 'announcement_rules_complete'),
+    ('fr', "calcul point", 'scoring_system_complete'),
+    ('fr', "partenaire ajout points valet as série", 'partner_points_system'),
+    ('en', "partner addition jack ace series", 'partner_points_system'),
+    ('en', "capot", 'capot_rules_complete'),
+])
+def test_keyword_search_hit(ai, language, query, rule_id):
+    response = ai.keyword_search(query, language)
+    rule = ai.rules_db.get_all_rules()[rule_id]
+    assert response is not None
+    assert response.startswith(f"**{rule[f'title_{language}']}**")
+
+
+@pytest.mark.parametrize('language,query', [
+    # Avance insuffisante sur la deuxième règle (2.25 contre 1.25)
+    ('en', "partner points"),
+    # Un seul mot-clé, trop peu spécifique
+    ('fr', "annonce"),
+    # Aucun mot-clé connu
+    ('fr', "bonjour"),
+])
+def test_keyword_search_ambiguous_or_unknown(ai, language, query):
+    assert ai.keyword_search(query, language) is None
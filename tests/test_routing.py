@@ -0,0 +1,100 @@
+import re
+
+import pytest
+
+import streamlit_belote_app as app
+
+# Routage d'origine (motifs et ordre du handle_enhanced_patterns initial), servant de référence
+_REFERENCE_ROUTES = (
+    ('handle_hand_evaluation_enhanced', {
+        'fr': [r'j.ai.*(?:valet|9|as|10|roi|dame).*(?:annoncer|conseiller)', r'(?:main|cartes?).*(?:annoncer|recommandation)',
+               r'(?:que|quoi|combien).*annoncer.*(?:avec|main)', r'évaluer.*main', r'analyser.*main'],
+        'en': [r'i.have.*(?:jack|9|ace|10|king|queen).*(?:announce|recommend)', r'(?:hand|cards?).*(?:announce|recommendation)',
+               r'(?:what|how much).*announce.*(?:with|hand)', r'evaluate.*hand', r'analyze.*hand'],
+    }),
+    ('points', None),
+    ('get_belote_detailed_info', {
+        'fr': [r'belote.*rebelote', r'roi.*dame.*atout', r'bonus.*20', r'(?:quand|comment).*(?:utiliser|jouer).*belote',
+               r'stratégie.*belote', r'belote.*stratégie'],
+        'en': [r'belote.*rebelote', r'king.*queen.*trump', r'bonus.*20', r'(?:when|how).*(?:use|play).*belote',
+               r'strategy.*belote', r'belote.*strategy'],
+    }),
+    ('get_coinche_detailed_info', {
+        'fr': [r'coinche.*surcoinche', r'multiplicateur', r'doubler.*contrat', r'(?:quand|comment).*coincher', r'stratégie.*coinche'],
+        'en': [r'coinche.*surcoinche', r'multiplier', r'double.*contract', r'(?:when|how).*coinche', r'strategy.*coinche'],
+    }),
+    ('get_capot_detailed_info', {
+        'fr': [r'capot', r'tous.*plis', r'250.*points', r'(?:quand|comment).*capot', r'stratégie.*capot'],
+        'en': [r'capot', r'all.*tricks', r'250.*points', r'(?:when|how).*capot', r'strategy.*capot'],
+    }),
+)
+
+_ROUTING_QUERIES = {
+    'fr': [
+        "Recommandation pour 120 points avec exemples", "Quand annoncer 110 points exactement?",
+        "Conseil pour 90", "comment faire 140 points", "J'ai valet, 9 et as, que dois-je annoncer avec cette main?",
+        "Analyser ma main: As cœur, As trèfle, Roi pique", "évaluer main", "cartes à annoncer",
+        "Stratégies avancées belote rebelote", "roi et dame d'atout", "bonus de 20", "comment jouer la belote",
+        "Système coinche surcoinche détaillé", "multiplicateur", "doubler le contrat", "quand coincher",
+        "Règles complètes du capot", "faire tous les plis", "250 points", "recommandation capot 130",
+        "Calcul avancé des scores", "bonjour", "150 points recommandation", "", "   ",
+    ],
+    'en': [
+        "Recommendation for 120 points with examples", "When to announce 110 points exactly?", "advice 100",
+        "I have Jack, 9, Ace and 10, what should I announce with this hand?", "evaluate my hand", "cards to announce",
+        "belote and rebelote", "king queen trump", "how to play belote", "coinche surcoinche", "multiplier",
+        "double the contract", "Complete capot rules", "all tricks", "score calculation", "hello",
+    ],
+}
+
+
+def _reference_route(query, language):
+    """Méthode de réponse et arguments choisis par le routage d'origine"""
+    query_lower = query.lower().strip()
+    for handler, patterns in _REFERENCE_ROUTES:
+        if handler == 'points':
+            for points in (int(match) for match in re.findall(r'\b(90|100|110|120|130|140)\b', query_lower)):
+                if any(word in query_lower for word in ['recommandation', 'recommendation', 'conseil', 'advice']):
+                    return 'get_announcement_recommendation_enhanced', (points,)
+                if any(word in query_lower for word in ['quand', 'when', 'comment', 'how']):
+                    return 'get_announcement_conditions_enhanced', (points,)
+        elif any(re.search(pattern, query_lower) for pattern in patterns.get(language, patterns['fr'])):
+            return handler, ()
+    return None
+
+
+@pytest.mark.parametrize('language,query', [
+    (language, query) for language, queries in _ROUTING_QUERIES.items() for query in queries
+])
+def test_route_matches_original_patterns(ai, language, query):
+    expected = _reference_route(query, language)
+    response = ai.handle_enhanced_patterns(query, language)
+    if expected is None:
+        assert response is None
+        return
+    handler, args = expected
+    if handler == 'handle_hand_evaluation_enhanced':
+        assert response == ai.handle_hand_evaluation_enhanced(query, language)
+    else:
+        assert response == getattr(ai, handler)(*args, language)
+
+
+def test_route_query_is_memoized():
+    app._route_query.cache_clear()
+    first = app._route_query("recommandation pour 120 points", 'fr')
+    second = app._route_query("recommandation pour 120 points", 'fr')
+    assert first == second == ('get_announcement_recommendation_enhanced', (120,))
+    info = app._route_query.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_route_query_unknown_language_uses_french_patterns():
+    assert app._route_query("multiplicateur", 'de') == app._route_query("multiplicateur", 'fr') == ('get_coinche_detailed_info', ())
+
+
+def test_route_cache_size_falls_back_on_invalid_value(monkeypatch, caplog):
+    monkeypatch.setenv('SOFIENE_ROUTE_CACHE_SIZE', 'beaucoup')
+    assert app._route_cache_size() == 1024
+    assert 'SOFIENE_ROUTE_CACHE_SIZE' in caplog.text
+    monkeypatch.setenv('SOFIENE_ROUTE_CACHE_SIZE', '64')
+    assert app._route_cache_size() == 64